@@ -42,3 +42,7 @@ class BaseDriver(ABC, Generic[T]):
     @abstractmethod
     async def send(self, channel: dict, text: str, **kwargs) -> str | None:
         """Send *text* to the given *channel* on this platform."""
+
+    async def stop(self):
+        """Ask a running ``start()`` to return and release its resources.
+        Drivers without explicit teardown rely on task cancellation instead."""
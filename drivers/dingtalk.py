@@ -1,12 +1,13 @@
-# DingTalk driver via alibabacloud-dingtalk.
+# DingTalk driver via the DingTalk v1.0 REST API.
 #
 # Receive: DingTalk pushes events to an HTTP endpoint you expose (outgoing
 #          robot webhook).  This driver starts an aiohttp server on a
 #          configurable port.  Set the URL in the DingTalk developer console
 #          under your bot's "Message Receive Mode" → "HTTP Mode".
 #
-# Send: uses the DingTalk Robot v1.0 org_group_send API, authenticated via
-#       an OAuth 2.0 access token that is cached and auto-refreshed.
+# Send: posts to the DingTalk Robot v1.0 groupMessages/send API directly
+#       over aiohttp, authenticated via an OAuth 2.0 access token that is
+#       cached and auto-refreshed.
 #
 # Config keys (under dingtalk.<instance_id>):
 #   app_key        – DingTalk app key   (required)
@@ -14,6 +15,8 @@
 #   robot_code     – Bot robot code     (required for sending)
 #   signing_secret – Webhook signing secret (optional; skips verify if absent)
 #   listen_path    – HTTP path          (default: "/dingtalk/event")
+#   max_concurrent_events – Webhook events handled at once; excess requests
+#                           wait up to 5 s, then get HTTP 503 (default: CPUs + 4)
 #
 # Rule channel keys:
 #   open_conversation_id – DingTalk open conversation ID
@@ -24,19 +27,14 @@
 from drivers.registry import register
 import asyncio
 import base64
-import hashlib
 import hmac
-import json
+import os
 import time
+from pathlib import Path
 from typing import Any
 
 import aiohttp
-from alibabacloud_tea_openapi import models as open_api_models
-from alibabacloud_tea_util import models as util_models
-from alibabacloud_dingtalk.oauth2_1_0.client import Client as OAuthClient
-from alibabacloud_dingtalk.oauth2_1_0 import models as oauth_models
-from alibabacloud_dingtalk.robot_1_0.client import Client as RobotClient
-from alibabacloud_dingtalk.robot_1_0 import models as robot_models
+import orjson
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
@@ -45,9 +43,12 @@ import services.media as media
 from services.message import Attachment, NormalizedMessage
 from services.config_schema import _DriverConfig
 from services.db import msg_db
+from services.util import get_data_path
 from drivers import BaseDriver
 
 _UPLOAD_URL = "https://api.dingtalk.com/v1.0/robot/messageFiles/upload"
+_SEND_URL = "https://api.dingtalk.com/v1.0/robot/groupMessages/send"
+_TOKEN_URL = "https://api.dingtalk.com/v1.0/oauth2/accessToken"
 
 
 class DingTalkConfig(_DriverConfig):
@@ -57,21 +58,36 @@ class DingTalkConfig(_DriverConfig):
     signing_secret: str = ""
     listen_path: str = "/dingtalk/event"
     max_file_size: int = 20 * 1024 * 1024
+    max_concurrent_events: int = (os.cpu_count() or 1) + 4
 
 
 logger = log.get_logger()
 
-_DINGTALK_ENDPOINT = "api.dingtalk.com"
+# How long a webhook request may wait for a free handler slot before a 503.
+_EVENT_QUEUE_TIMEOUT = 5.0
+
+# Display labels for Attachment.type in text fallbacks.
+_TYPE_LABEL = {"image": "Image", "video": "Video", "voice": "Voice", "file": "File"}
+
+
+def _type_label(att_type: str) -> str:
+    return _TYPE_LABEL.get(att_type) or att_type.capitalize()
 
 
 class DingTalkDriver(BaseDriver[DingTalkConfig]):
     def __init__(self, instance_id: str, config: DingTalkConfig, bridge):
         super().__init__(instance_id, config, bridge)
-        self._oauth_client: OAuthClient | None = None
-        self._robot_client: RobotClient | None = None
         self._session: aiohttp.ClientSession | None = None
+        self._shutdown: asyncio.Future[None] | None = None
         self._access_token: str = ""
         self._token_expires_at: float = 0.0
+        self._token_lock: asyncio.Lock = asyncio.Lock()
+        self._event_sem = asyncio.Semaphore(config.max_concurrent_events)
+        # Signing secret is immutable config; encode it once for _verify_sign.
+        self._signing_secret_bytes = config.signing_secret.encode("utf-8")
+        self._token_cache_path = (
+            Path(get_data_path()) / "cache" / f"dingtalk_{instance_id}.json"
+        )
 
     # ------------------------------------------------------------------
     # Lifecycle
@@ -80,10 +96,10 @@ class DingTalkDriver(BaseDriver[DingTalkConfig]):
     async def start(self):
         self.bridge.register_sender(self.instance_id, self.send)
 
-        cfg = open_api_models.Config(endpoint=_DINGTALK_ENDPOINT)
-        self._oauth_client = OAuthClient(cfg)
-        self._robot_client = RobotClient(cfg)
-        self._session = aiohttp.ClientSession()
+        self._session = aiohttp.ClientSession(
+            json_serialize=lambda obj: orjson.dumps(obj).decode()
+        )
+        self._load_cached_token()
 
         app = FastAPI()
         app.add_api_route("/", self._handle_http, methods=["POST"])
@@ -97,28 +113,41 @@ class DingTalkDriver(BaseDriver[DingTalkConfig]):
             f"DingTalk [{self.instance_id}] webhook mounted at {self.config.listen_path}"
         )
 
+        self._shutdown = asyncio.get_running_loop().create_future()
         try:
-            await asyncio.Event().wait()
+            await self._shutdown
         finally:
             await self._session.close()
             self._session = None
 
+    async def stop(self):
+        if self._shutdown is not None and not self._shutdown.done():
+            self._shutdown.set_result(None)
+
     # ------------------------------------------------------------------
     # Receive
     # ------------------------------------------------------------------
 
     async def _handle_http(self, request: Request) -> JSONResponse:
+        # Bound concurrent event handling so a webhook flood queues here
+        # instead of piling up bridge dispatches and outgoing sends.
         try:
-            body: dict = json.loads(await request.body())
-        except json.JSONDecodeError:
-            return JSONResponse({"message": "bad request"}, status_code=400)
-        except Exception:
-            return JSONResponse({"message": "receive failed"}, status_code=500)
+            await asyncio.wait_for(self._event_sem.acquire(), _EVENT_QUEUE_TIMEOUT)
+        except TimeoutError:
+            logger.warning(f"DingTalk [{self.instance_id}] webhook busy, rejecting")
+            return JSONResponse({"message": "busy"}, status_code=503)
+        try:
+            return await self._process_http(request)
+        finally:
+            self._event_sem.release()
 
+    async def _process_http(self, request: Request) -> JSONResponse:
+        # The signature only covers headers, so reject unsigned requests
+        # before reading or parsing the body.
         if self.config.signing_secret:
             ts = request.headers.get("timestamp", "")
             sig = request.headers.get("sign", "")
-            match, err = _verify_sign(ts, self.config.signing_secret, sig)
+            match, err = _verify_sign(ts, self._signing_secret_bytes, sig)
             if not match:
                 logger.warning(
                     f"DingTalk [{self.instance_id}] webhook signature mismatch: {err}"
@@ -127,6 +156,13 @@ class DingTalkDriver(BaseDriver[DingTalkConfig]):
                 )
                 return JSONResponse({"message": "forbidden"}, status_code=403)
 
+        try:
+            body: dict = orjson.loads(await request.body())
+        except orjson.JSONDecodeError:
+            return JSONResponse({"message": "bad request"}, status_code=400)
+        except Exception:
+            return JSONResponse({"message": "receive failed"}, status_code=500)
+
         if body.get("msgtype") != "text":
             return JSONResponse({})
 
@@ -192,10 +228,8 @@ class DingTalkDriver(BaseDriver[DingTalkConfig]):
         if reply_to_id:
             text = f"> [Reply]\n{text}"
 
-        try:
-            token = await self._get_access_token()
-        except Exception:
-            logger.exception(f"DingTalk [{self.instance_id}] access token error")
+        # Fail once here rather than once per message below.
+        if await self._token() is None:
             return
 
         # Handle mentions
@@ -207,10 +241,12 @@ class DingTalkDriver(BaseDriver[DingTalkConfig]):
 
         if text.strip():
             # sampleText supports "at" field
-            param: dict[str, Any] = {"content": text}
+            param: dict[str, Any] | str
             if at_uids:
-                param["at"] = {"atUserIds": at_uids}
-            await self._send_org_msg(open_conv_id, token, "sampleText", param)
+                param = {"content": text, "at": {"atUserIds": at_uids}}
+            else:
+                param = _text_msg_param(text)
+            await self._send_org_msg(open_conv_id, "sampleText", param)
 
         source_proxy = self._source_proxy_from_kwargs(kwargs)
 
@@ -221,7 +257,7 @@ class DingTalkDriver(BaseDriver[DingTalkConfig]):
             # Images with a public URL → sampleImageMsg (renders inline)
             if att.type == "image" and att.url:
                 await self._send_org_msg(
-                    open_conv_id, token, "sampleImageMsg", {"photoURL": att.url}
+                    open_conv_id, "sampleImageMsg", {"photoURL": att.url}
                 )
                 continue
 
@@ -233,33 +269,28 @@ class DingTalkDriver(BaseDriver[DingTalkConfig]):
                 label = att.name or att.url or ""
                 await self._send_org_msg(
                     open_conv_id,
-                    token,
                     "sampleText",
-                    {"content": f"[{att.type.capitalize()}: {label}]"},
+                    _text_msg_param(f"[{_type_label(att.type)}: {label}]"),
                 )
                 continue
 
             data_bytes, mime = result
             fname = media.filename_for(att.name, mime)
             media_type = "voice" if mime.startswith("audio/") else "file"
-            media_id = await self._upload_media(
-                token, data_bytes, fname, mime, media_type
-            )
+            media_id = await self._upload_media(data_bytes, fname, mime, media_type)
 
             if not media_id:
                 label = att.name or fname
                 await self._send_org_msg(
                     open_conv_id,
-                    token,
                     "sampleText",
-                    {"content": f"[{att.type.capitalize()}: {label}]"},
+                    _text_msg_param(f"[{_type_label(att.type)}: {label}]"),
                 )
                 continue
 
             if media_type == "voice":
                 await self._send_org_msg(
                     open_conv_id,
-                    token,
                     "sampleAudio",
                     {"mediaId": media_id, "duration": "0"},
                 )
@@ -267,39 +298,59 @@ class DingTalkDriver(BaseDriver[DingTalkConfig]):
                 ext = fname.rsplit(".", 1)[-1].lower() if "." in fname else "bin"
                 await self._send_org_msg(
                     open_conv_id,
-                    token,
                     "sampleFile",
                     {"mediaId": media_id, "fileName": fname, "fileType": ext},
                 )
 
     async def _send_org_msg(
-        self, open_conv_id: str, token: str, msg_key: str, msg_param: dict
+        self, open_conv_id: str, msg_key: str, msg_param: dict | str
     ) -> None:
-        assert self._robot_client is not None
-        robot_client = self._robot_client
-        headers = robot_models.OrgGroupSendHeaders(x_acs_dingtalk_access_token=token)
-        req = robot_models.OrgGroupSendRequest(
-            robot_code=self.config.robot_code,
-            open_conversation_id=open_conv_id,
-            msg_key=msg_key,
-            msg_param=json.dumps(msg_param),
-        )
-        loop = asyncio.get_running_loop()
-        try:
-            await loop.run_in_executor(
-                None,
-                lambda: robot_client.org_group_send_with_options(
-                    req, headers, util_models.RuntimeOptions()
-                ),
-            )
-        except Exception:
-            logger.exception(
-                f"DingTalk [{self.instance_id}] send failed (msg {msg_key})"
+        """Send a robot group message; a str *msg_param* is sent pre-serialized."""
+        if self._session is None:
+            return
+        if not isinstance(msg_param, str):
+            msg_param = orjson.dumps(msg_param).decode()
+        payload = {
+            "robotCode": self.config.robot_code,
+            "openConversationId": open_conv_id,
+            "msgKey": msg_key,
+            "msgParam": msg_param,
+        }
+        token = await self._token()
+        if token is None:
+            return
+        # A 401 means the cached token was revoked early; refresh and retry once.
+        for attempt in range(2):
+            try:
+                async with self._session.post(
+                    _SEND_URL,
+                    json=payload,
+                    headers={"x-acs-dingtalk-access-token": token},
+                ) as resp:
+                    if resp.status == 200:
+                        return
+                    status = resp.status
+                    body = await resp.text()
+            except Exception:
+                logger.exception(
+                    f"DingTalk [{self.instance_id}] send failed (msg {msg_key})"
+                )
+                return
+
+            if status == 401 and attempt == 0:
+                token = await self._token(stale=token)
+                if token is None:
+                    return
+                continue
+
+            logger.error(
+                f"DingTalk [{self.instance_id}] send failed (msg {msg_key}) "
+                f"HTTP {status}: {body[:200]}"
             )
+            return
 
     async def _upload_media(
         self,
-        token: str,
         data: bytes,
         fname: str,
         mime: str,
@@ -307,50 +358,143 @@ class DingTalkDriver(BaseDriver[DingTalkConfig]):
     ) -> str | None:
         if self._session is None:
             return None
-        form = aiohttp.FormData()
-        form.add_field("robotCode", self.config.robot_code)
-        form.add_field("mediaType", media_type)
-        form.add_field("file", data, filename=fname, content_type=mime)
-        try:
-            async with self._session.post(
-                _UPLOAD_URL,
-                data=form,
-                headers={"x-acs-dingtalk-access-token": token},
-            ) as resp:
-                if resp.status == 200:
-                    js = await resp.json(content_type=None)
-                    return js.get("mediaId")
-                body = await resp.text()
-                logger.error(
-                    f"DingTalk [{self.instance_id}] media upload failed "
-                    f"HTTP {resp.status}: {body[:200]}"
-                )
-        except Exception:
-            logger.exception(f"DingTalk [{self.instance_id}] media upload error")
+        token = await self._token()
+        if token is None:
+            return None
+        # Same 401 handling as _send_org_msg; a FormData is single-use.
+        for attempt in range(2):
+            form = aiohttp.FormData()
+            form.add_field("robotCode", self.config.robot_code)
+            form.add_field("mediaType", media_type)
+            form.add_field("file", data, filename=fname, content_type=mime)
+            try:
+                async with self._session.post(
+                    _UPLOAD_URL,
+                    data=form,
+                    headers={"x-acs-dingtalk-access-token": token},
+                ) as resp:
+                    if resp.status == 200:
+                        js = await resp.json(content_type=None, loads=orjson.loads)
+                        return js.get("mediaId")
+                    status = resp.status
+                    body = await resp.text()
+            except Exception:
+                logger.exception(f"DingTalk [{self.instance_id}] media upload error")
+                return None
+
+            if status == 401 and attempt == 0:
+                token = await self._token(stale=token)
+                if token is None:
+                    return None
+                continue
+
+            logger.error(
+                f"DingTalk [{self.instance_id}] media upload failed "
+                f"HTTP {status}: {body[:200]}"
+            )
+            return None
         return None
 
     # ------------------------------------------------------------------
     # Token management
     # ------------------------------------------------------------------
 
+    async def _token(self, stale: str | None = None) -> str | None:
+        """Return a usable access token, or None (logged) if none can be had.
+
+        *stale* is a token a request was just rejected with (HTTP 401); it is
+        only invalidated if no concurrent send has replaced it already.
+        """
+        if stale is not None and stale == self._access_token:
+            self._token_expires_at = 0.0
+        try:
+            return await self._get_access_token()
+        except Exception:
+            logger.exception(f"DingTalk [{self.instance_id}] access token error")
+            return None
+
     async def _get_access_token(self) -> str:
         if time.monotonic() < self._token_expires_at - 60:
             return self._access_token
 
-        assert self._oauth_client is not None
-        oauth_client = self._oauth_client
-        req = oauth_models.GetAccessTokenRequest(
-            app_key=self.config.app_key,
-            app_secret=self.config.app_secret,
+        async with self._token_lock:
+            # Another send may have refreshed the token while we were waiting.
+            if time.monotonic() < self._token_expires_at - 60:
+                return self._access_token
+
+            if self._session is None:
+                raise RuntimeError("HTTP session not started")
+            async with self._session.post(
+                _TOKEN_URL,
+                json={
+                    "appKey": self.config.app_key,
+                    "appSecret": self.config.app_secret,
+                },
+            ) as resp:
+                js = await resp.json(content_type=None, loads=orjson.loads)
+                if resp.status != 200:
+                    raise RuntimeError(f"HTTP {resp.status}: {js}")
+            expire_in = js.get("expireIn") or 7200
+            self._access_token = js.get("accessToken") or ""
+            self._token_expires_at = time.monotonic() + expire_in
+            logger.debug(f"DingTalk [{self.instance_id}] access token refreshed")
+            await asyncio.to_thread(
+                self._save_cached_token, self._access_token, time.time() + expire_in
+            )
+            return self._access_token
+
+    def _load_cached_token(self) -> None:
+        """Restore a still-valid access token persisted by a previous run."""
+        try:
+            cached = orjson.loads(self._token_cache_path.read_bytes())
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.debug(f"DingTalk [{self.instance_id}] token cache unreadable: {e}")
+            return
+
+        # The cache is only valid for the app it was issued to.
+        if cached.get("app_key") != self.config.app_key:
+            return
+        # Expiry is stored as wall-clock time since monotonic clocks reset on restart.
+        remaining = float(cached.get("expires_at", 0)) - time.time()
+        token = cached.get("access_token") or ""
+        if not token or remaining <= 60:
+            return
+
+        self._access_token = token
+        self._token_expires_at = time.monotonic() + remaining
+        logger.debug(
+            f"DingTalk [{self.instance_id}] reusing cached access token "
+            f"({int(remaining)}s left)"
         )
-        loop = asyncio.get_running_loop()
-        resp = await loop.run_in_executor(
-            None, lambda: oauth_client.get_access_token(req)
+
+    def _save_cached_token(self, token: str, expires_at: float) -> None:
+        """Persist *token* for the next run; blocking, call via a thread.
+
+        The file holds a live credential, so it is only readable by the owner.
+        """
+        path = self._token_cache_path
+        tmp = path.with_suffix(".tmp")
+        data = orjson.dumps(
+            {
+                "app_key": self.config.app_key,
+                "access_token": token,
+                "expires_at": expires_at,
+            }
         )
-        self._access_token = resp.body.access_token or ""
-        self._token_expires_at = time.monotonic() + (resp.body.expire_in or 7200)
-        logger.debug(f"DingTalk [{self.instance_id}] access token refreshed")
-        return self._access_token
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                # O_CREAT leaves the mode of a leftover tmp file untouched.
+                os.fchmod(f.fileno(), 0o600)
+                f.write(data)
+            tmp.replace(path)
+        except OSError as e:
+            logger.warning(
+                f"DingTalk [{self.instance_id}] failed to write token cache {path}: {e}"
+            )
 
 
 # ------------------------------------------------------------------
@@ -358,22 +502,21 @@ class DingTalkDriver(BaseDriver[DingTalkConfig]):
 # ------------------------------------------------------------------
 
 
-def _verify_sign(timestamp: str, secret: str, sign: str) -> tuple[bool, str]:
+def _text_msg_param(content: str) -> str:
+    """Serialize a plain sampleText msgParam; only the content needs escaping."""
+    return '{"content":' + orjson.dumps(content).decode() + "}"
+
+
+def _verify_sign(timestamp: str, secret: bytes, sign: str) -> tuple[bool, str]:
     """Verify DingTalk webhook HMAC-SHA256 signature."""
     if not timestamp:
         return False, "no timestamp found"
     if not sign:
         return False, "no sign found"
     try:
-        string_to_sign = f"{timestamp}\n{secret}"
-        expected = base64.b64encode(
-            hmac.new(
-                secret.encode("utf-8"),
-                string_to_sign.encode("utf-8"),
-                digestmod=hashlib.sha256,
-            ).digest()
-        ).decode("utf-8")
-        return hmac.compare_digest(expected, sign), ""
+        string_to_sign = b"%s\n%s" % (timestamp.encode("utf-8"), secret)
+        expected = base64.b64encode(hmac.digest(secret, string_to_sign, "sha256"))
+        return hmac.compare_digest(expected, sign.encode("ascii")), ""
     except Exception as e:
         return False, str(e)
 
@@ -16,17 +16,25 @@
 #   send_method   – "webhook" (default) | "bot"
 #   max_file_size – Max bytes per attachment when sending (default 8 MB, Discord webhook limit)
 #   send_replies_as_bot – If true, reply messages are sent by bot when available.
+#   webhook_batch_window – Seconds to wait for further text-only webhook messages
+#                          to merge into one post (default 0, disabled).  Only
+#                          the first merged message gets the Discord message id
+#                          for reply/recall mapping.
 #
 # Note: webhook_url should be configured per channel in rules, not at instance level.
 
 from drivers.registry import register
+import asyncio
 import io
-import json
+import random
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
 import re
 
 import discord
 import aiohttp
+import orjson
 
 from typing import Literal
 
@@ -39,6 +47,9 @@ from services.message import Attachment, NormalizedMessage
 from services.util import get_data_path
 from services.config_schema import _DriverConfig, CoercedBool
 from services.config import get_proxy, UNSET
+from services.db import msg_db
+from services.batching import SendBatcher
+from services.ingress import IngressQueue
 from drivers import BaseDriver
 
 
@@ -52,6 +63,7 @@ class DiscordConfig(_DriverConfig):
     allow_mentions_users: CoercedBool = True
     allow_mentions_roles: CoercedBool = False
     sanitize_mass_mentions: CoercedBool = True
+    webhook_batch_window: float = 0
     proxy: str | None = UNSET
 
     @field_validator("cqface_webhook_fallback", mode="before")
@@ -67,12 +79,57 @@ class DiscordConfig(_DriverConfig):
 
 logger = log.get_logger()
 
+# Display labels for Attachment.type in text fallbacks.
+_TYPE_LABEL = {"image": "Image", "video": "Video", "voice": "Voice", "file": "File"}
+
+
+def _type_label(att_type: str) -> str:
+    return _TYPE_LABEL.get(att_type) or att_type.capitalize()
+
+
+# Webhook posts answered with 429 are retried up to this many attempts in total.
+_WEBHOOK_ATTEMPTS = 4
+
+
+def _retry_delay(resp: aiohttp.ClientResponse, attempt: int) -> float:
+    """Seconds to wait after a 429: Retry-After if given, else exponential,
+    plus jitter so concurrent senders do not retry in lockstep."""
+    try:
+        delay = float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        delay = 2.0**attempt
+    return delay + random.uniform(0, 0.5)
+
+
 _CQFACE_RE = re.compile(r":cqface(\d+):")
 _RICHHEADER_RE = re.compile(r"<richheader\b([^/]*)/>", re.IGNORECASE)
 _ATTR_RE = re.compile(r'(\w+)="([^"]*)"')
 _MASS_MENTION_RE = re.compile(r"@(everyone|here)\b", re.IGNORECASE)
 
 
+# Discord rejects message content longer than this many characters.
+_CONTENT_LIMIT = 2000
+
+
+# Max text-only webhook posts merged into one request (also capped by length).
+_WEBHOOK_BATCH_MAX = 10
+
+# (post URL, payload, future for the Discord message id) of a held-back post
+_QueuedWebhook = tuple[str, dict, asyncio.Future]
+
+
+def _resolve(done: asyncio.Future, value: str | None) -> None:
+    if not done.done():  # the sender may have been cancelled meanwhile
+        done.set_result(value)
+
+
+def _webhook_batch_key(webhook_url: str) -> str:
+    """Batch key for a webhook: its URL minus the secret token, so the key can
+    appear in logs and task names.  Thread query parameters are kept."""
+    base, sep, query = webhook_url.partition("?")
+    return base.rsplit("/", 1)[0] + sep + query
+
+
 def _parse_richheader(text: str) -> tuple[str, dict | None]:
     m = _RICHHEADER_RE.search(text)
     if not m:
@@ -82,6 +139,36 @@ def _parse_richheader(text: str) -> tuple[str, dict | None]:
     return clean, attrs or None
 
 
+@lru_cache(maxsize=4096)
+def _snowflake_str(snowflake: int) -> str:
+    """``str()`` of a guild/channel id, cached since the same few ids repeat
+    on every message.  Per-message ids (message, author) are not cached."""
+    return str(snowflake)
+
+
+@lru_cache(maxsize=256)
+def _rich_header_prefix(title: str, content: str) -> str:
+    """Markdown line prepended for a rich header; rules repeat the same few."""
+    return f"**{title}**" + (f" · *{content}*" if content else "")
+
+
+def _cqface_emojis(emojis) -> dict[str, str]:
+    """Map ``cqface<id>`` custom emoji names to their ``<:name:id>`` strings."""
+    index: dict[str, str] = {}
+    for emoji in emojis:
+        if emoji.name.startswith("cqface"):
+            index.setdefault(emoji.name, str(emoji))
+    return index
+
+
+# MIME top-level type → Attachment.type; anything else is a plain file.
+_MIME_PREFIX_TO_ATT_TYPE = {"image": "image", "video": "video", "audio": "voice"}
+
+
+def _mime_to_att_type(mime: str) -> str:
+    return _MIME_PREFIX_TO_ATT_TYPE.get(mime.partition("/")[0], "file")
+
+
 def _sanitize_mass_mentions(text: str) -> tuple[str, bool]:
     """Neutralize @everyone/@here so they cannot trigger mass pings."""
     sanitized, count = _MASS_MENTION_RE.subn(lambda m: f"@ {m.group(1)}", text)
@@ -101,6 +188,24 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
         self._emoji_cache: dict[str, str] = {}
         # name → emoji_id index built lazily from discord_emojis.json
         self._emoji_db: dict[str, str] | None = None
+        # "cqface<id>" → "<:name:id>" for custom emojis in the bot's guilds
+        self._guild_emojis: dict[str, str] = {}
+        # guild id → that guild's own cqface entries, merged into _guild_emojis
+        self._guild_emoji_index: dict[int, dict[str, str]] = {}
+        self._ingress = IngressQueue(f"Discord [{instance_id}]", bridge.on_message)
+        self._batcher: SendBatcher[_QueuedWebhook] | None = None
+        if config.webhook_batch_window > 0:
+            self._batcher = SendBatcher(
+                f"Discord [{instance_id}]",
+                self._flush_webhook_batch,
+                config.webhook_batch_window,
+                _WEBHOOK_BATCH_MAX,
+                on_drop=self._drop_webhook_batch,
+            )
+        # user id → display name last saved for senders in unrouted channels
+        self._saved_users: dict[str, str] = {}
+        # batch key → held while a post to that webhook is in flight
+        self._webhook_locks: dict[str, asyncio.Lock] = {}
 
     def _allowed_mentions_parse(self) -> list[str]:
         parse: list[str] = []
@@ -120,11 +225,7 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
         self.bridge.register_sender(self.instance_id, self.send)
         if self._proxy:
             logger.debug(f"Discord [{self.instance_id}] using proxy {self._proxy}")
-            self._session = aiohttp.ClientSession(
-                connector=aiohttp.TCPConnector(ssl=False), proxy=self._proxy
-            )
-        else:
-            self._session = aiohttp.ClientSession()
+        self._session = media.get_session(self._proxy)
 
         if not self._bot_token:
             logger.warning(
@@ -135,10 +236,22 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
 
         intents = discord.Intents.default()
         intents.message_content = True
+        # Only messages and guild/emoji state are used; skip the rest of the
+        # default gateway traffic and keep no member cache.
+        intents.typing = False
+        intents.voice_states = False
+        intents.invites = False
+        intents.integrations = False
+        intents.webhooks = False
+        intents.guild_scheduled_events = False
+        intents.auto_moderation = False
+        client_opts: dict = {
+            "intents": intents,
+            "member_cache_flags": discord.MemberCacheFlags.none(),
+        }
         if self._proxy:
-            self._client = discord.Client(intents=intents, proxy=self._proxy)
-        else:
-            self._client = discord.Client(intents=intents)
+            client_opts["proxy"] = self._proxy
+        self._client = discord.Client(**client_opts)
 
         @self._client.event
         async def on_ready():
@@ -146,6 +259,25 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
             logger.info(
                 f"Discord [{self.instance_id}] logged in as {self._client.user}"
             )
+            self._guild_emoji_index = {
+                g.id: _cqface_emojis(g.emojis) for g in self._client.guilds
+            }
+            self._merge_guild_emojis()
+
+        @self._client.event
+        async def on_guild_emojis_update(guild, before, after):
+            self._guild_emoji_index[guild.id] = _cqface_emojis(after)
+            self._merge_guild_emojis()
+
+        @self._client.event
+        async def on_guild_join(guild):
+            self._guild_emoji_index[guild.id] = _cqface_emojis(guild.emojis)
+            self._merge_guild_emojis()
+
+        @self._client.event
+        async def on_guild_remove(guild):
+            if self._guild_emoji_index.pop(guild.id, None) is not None:
+                self._merge_guild_emojis()
 
         @self._client.event
         async def on_message(message: discord.Message):
@@ -157,15 +289,29 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
             await self._on_message(message)
 
         # Blocks until the bot disconnects
-        await self._client.start(self._bot_token)
+        self._ingress.start()
+        try:
+            await self._client.start(self._bot_token)
+        finally:
+            self._ingress.stop()
+            if self._batcher is not None:
+                self._batcher.stop()
 
     # ------------------------------------------------------------------
     # Receive
     # ------------------------------------------------------------------
 
     async def _on_message(self, message: discord.Message):
-        server_id = str(message.guild.id) if message.guild else ""
-        channel_id = str(message.channel.id)
+        server_id = _snowflake_str(message.guild.id) if message.guild else ""
+        channel_id = _snowflake_str(message.channel.id)
+        # Skip channels no rule forwards from; bridge commands still go through.
+        if not self.bridge.is_routed(
+            self.instance_id, {"server_id": server_id, "channel_id": channel_id}
+        ) and not message.content.lstrip().startswith("/"):
+            # The bridge would still have recorded the sender for /ping and
+            # mention lookups; do that here, writing only on a name change.
+            self._remember_user(str(message.author.id), message.author.name)
+            return
         logger.debug(
             f"Discord [{self.instance_id}] message from {message.author} "
             f"server={server_id} channel={channel_id}"
@@ -175,17 +321,13 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
 
         attachments: list[Attachment] = []
         for att in message.attachments:
-            ct = att.content_type or ""
-            if ct.startswith("image/"):
-                att_type = "image"
-            elif ct.startswith("video/"):
-                att_type = "video"
-            elif ct.startswith("audio/"):
-                att_type = "voice"
-            else:
-                att_type = "file"
             attachments.append(
-                Attachment(type=att_type, url=att.url, name=att.filename, size=att.size)
+                Attachment(
+                    type=_mime_to_att_type(att.content_type or ""),
+                    url=att.url,
+                    name=att.filename,
+                    size=att.size,
+                )
             )
 
         if not text.strip() and not attachments:
@@ -194,11 +336,9 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
             )
             return
 
-        avatar = (
-            str(message.author.display_avatar.url)
-            if message.author.display_avatar
-            else ""
-        )
+        # display_avatar builds a new Asset on every access (falling back to
+        # the default avatar), so read it once; it is never falsy.
+        avatar = message.author.display_avatar.url
 
         mentions = []
         for u in message.mentions:
@@ -221,7 +361,13 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
             source_proxy=self._media_proxy,
             username=message.author.name,
         )
-        await self.bridge.on_message(msg)
+        self._ingress.put(msg)
+
+    def _remember_user(self, user_id: str, username: str) -> None:
+        display_name = username.strip() or user_id
+        if self._saved_users.get(user_id) != display_name:
+            msg_db().save_user(self.instance_id, user_id, display_name)
+            self._saved_users[user_id] = display_name
 
     # ------------------------------------------------------------------
     # CQ face emoji resolution
@@ -239,28 +385,27 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
 
         self._emoji_db = {}
         try:
-            raw = json.loads(
-                (Path(get_data_path()) / "discord_emojis.json").read_text(
-                    encoding="utf-8"
-                )
+            raw = orjson.loads(
+                (Path(get_data_path()) / "discord_emojis.json").read_bytes()
             )
             if isinstance(raw, dict) and "items" in raw:
                 # Discord API export format
-                for item in raw["items"]:
-                    name = item.get("name", "")
-                    eid = item.get("id", "")
-                    if name and eid:
-                        self._emoji_db[name] = eid
+                self._emoji_db = {
+                    name: eid
+                    for item in raw["items"]
+                    if (name := item.get("name")) and (eid := item.get("id"))
+                }
             elif isinstance(raw, dict):
                 # Simple {face_id: emoji_id | {name, id}} map
-                for face_id, entry in raw.items():
-                    if isinstance(entry, str):
-                        self._emoji_db[f"cqface{face_id}"] = entry
-                    elif isinstance(entry, dict):
-                        name = entry.get("name", f"cqface{face_id}")
-                        eid = entry.get("id", "")
-                        if eid:
-                            self._emoji_db[name] = eid
+                self._emoji_db = {
+                    f"cqface{face_id}": entry
+                    for face_id, entry in raw.items()
+                    if isinstance(entry, str)
+                } | {
+                    entry.get("name", f"cqface{face_id}"): eid
+                    for face_id, entry in raw.items()
+                    if isinstance(entry, dict) and (eid := entry.get("id"))
+                }
         except FileNotFoundError:
             pass
         except Exception as exc:
@@ -270,15 +415,25 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
 
         return self._emoji_db
 
+    def _merge_guild_emojis(self) -> None:
+        """Rebuild the cqface name → emoji string map from the per-guild index."""
+        merged: dict[str, str] = {}
+        for entries in self._guild_emoji_index.values():
+            for name, emoji in entries.items():
+                merged.setdefault(name, emoji)
+        self._guild_emojis = merged
+        # Resolved faces may point at emojis that were renamed or deleted.
+        self._emoji_cache.clear()
+
     def _resolve_cqface(self, face_id: str) -> str:
         """Return the Discord emoji string for a CQ face ID.
 
         Lookup order:
         1. In-process cache (populated by previous calls).
         2. ``data/discord_emojis.json`` indexed by emoji name ``cqface<id>``.
-        3. Walk every guild the bot is connected to and search for a custom
-           emoji whose name is ``cqface<id>``.
-                4. Fall back to the Unicode mapping in ``db/cqface-map.yaml``.
+        3. Custom emojis named ``cqface<id>`` in the guilds the bot has
+           joined, indexed on ready and on emoji updates.
+        4. Fall back to the Unicode mapping in ``db/cqface-map.yaml``.
         """
         if face_id in self._emoji_cache:
             return self._emoji_cache[face_id]
@@ -292,19 +447,18 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
             self._emoji_cache[face_id] = result
             return result
 
-        # 2. Discord API — search all guilds the bot has joined
-        if self._client is not None:
-            for guild in self._client.guilds:
-                emoji = discord.utils.get(guild.emojis, name=target_name)
-                if emoji is not None:
-                    result = str(emoji)  # "<:name:id>"
-                    self._emoji_cache[face_id] = result
-                    return result
+        # 2. Custom emojis from the guilds the bot has joined
+        result = self._guild_emojis.get(target_name)
+        if result is not None:
+            self._emoji_cache[face_id] = result
+            return result
 
         return cqface.resolve_cqface(face_id)
 
     def _expand_cqface_emojis(self, text: str) -> str:
         """Replace all ``:cqface<id>:`` tokens with Discord emoji strings."""
+        if ":cqface" not in text:
+            return text
         return _CQFACE_RE.sub(lambda m: self._resolve_cqface(m.group(1)), text)
 
     # ------------------------------------------------------------------
@@ -318,7 +472,8 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
         attachments: list[Attachment] | None = None,
         **kwargs,
     ):
-        has_cqface = bool(re.search(r":cqface\d+:", text))
+        # Cheap substring check first; most messages carry no CQ faces.
+        has_cqface = ":cqface" in text and _CQFACE_RE.search(text) is not None
         reply_to_id = kwargs.get("reply_to_id")
         force_bot = False
 
@@ -398,8 +553,9 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
 
         rich_header = kwargs.get("rich_header")
         if rich_header:
-            t, c = rich_header.get("title", ""), rich_header.get("content", "")
-            prefix = f"**{t}**" + (f" · *{c}*" if c else "")
+            prefix = _rich_header_prefix(
+                rich_header.get("title", ""), rich_header.get("content", "")
+            )
             text = f"{prefix}\n{text}" if text else prefix
 
         # Handle mentions: replace @Name with <@id>
@@ -445,11 +601,37 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
                 channel, text, attachments, webhook_url, **webhook_kwargs
             )
         elif self._client is not None:
-            return await self._send_bot(channel, text, attachments, **kwargs)
+            # Bot posts land in the webhook's channel; keep them behind its
+            # batched text.
+            async with self._webhook_turn(webhook_url):
+                return await self._send_bot(channel, text, attachments, **kwargs)
         else:
             logger.warning(f"Discord [{self.instance_id}] no send method available")
             return None
 
+    async def _open_webhook_file(
+        self, att: Attachment, source_proxy: str | None
+    ) -> tuple[bytes | media.MediaStream, str, str] | None:
+        """Return ``(body, mime, filename)`` for a webhook upload.
+
+        URL attachments are streamed straight into the upload when the source
+        declares their size; voice is excluded since AMR needs transcoding.
+        """
+        if att.data is None and att.type != "voice":
+            stream = await media.open_stream(
+                att.url, self.config.max_file_size, source_proxy
+            )
+            if stream is not None:
+                mime = stream.content_type
+                return stream, mime, media.filename_for(att.name, mime)
+        result = await media.fetch_attachment(
+            att, self.config.max_file_size, source_proxy
+        )
+        if not result:
+            return None
+        data_bytes, mime = result
+        return data_bytes, mime, media.filename_for(att.name, mime)
+
     async def _send_webhook(
         self,
         channel: dict,
@@ -498,24 +680,33 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
             else:
                 payload["avatar_url"] = avatar
 
-        # Download each attachment; collect as (bytes, mime, filename) triples
-        files: list[tuple[bytes, str, str]] = []
+        # Prepare all attachments concurrently; results keep attachment order.
+        files: list[tuple[bytes | media.MediaStream, str, str]] = []
+        streams: list[media.MediaStream] = []
         source_proxy = self._source_proxy_from_kwargs(kwargs)
-        for att in attachments or []:
-            if not att.url and att.data is None:
-                continue
-            result = await media.fetch_attachment(
-                att, self.config.max_file_size, source_proxy
-            )
-            if result:
-                data_bytes, mime = result
-                fname = media.filename_for(att.name, mime)
-                files.append((data_bytes, mime, fname))
+        pending = [a for a in attachments or [] if a.url or a.data is not None]
+        results = await asyncio.gather(
+            *(self._open_webhook_file(a, source_proxy) for a in pending),
+            return_exceptions=True,
+        )
+        fallback_labels: list[str] = []
+        for att, result in zip(pending, results):
+            if isinstance(result, tuple):
+                if isinstance(result[0], media.MediaStream):
+                    streams.append(result[0])
+                files.append(result)
             else:
                 # Size exceeded or download failed — append URL or name as text
                 label = att.name or att.url
+                if isinstance(result, BaseException):
+                    logger.warning(
+                        f"Discord [{self.instance_id}] attachment {label} failed: "
+                        f"{result!r}"
+                    )
                 ref = f"({att.url})" if att.url else ""
-                payload["content"] += f"\n[{att.type.capitalize()}: {label}]{ref}"
+                fallback_labels.append(f"[{_type_label(att.type)}: {label}]{ref}")
+        if fallback_labels:
+            payload["content"] = "\n".join([payload["content"], *fallback_labels])
 
         url = webhook_url + ("&" if "?" in webhook_url else "?") + "wait=true"
 
@@ -526,45 +717,148 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
                 f"avatar_url is {'set' if payload.get('avatar_url') else 'unset'}"
             )
             if files:
-                form = aiohttp.FormData()
-                form.add_field(
-                    "payload_json", json.dumps(payload), content_type="application/json"
-                )
-                for i, (data_bytes, mime, fname) in enumerate(files):
-                    form.add_field(
-                        f"files[{i}]", data_bytes, filename=fname, content_type=mime
-                    )
-                async with self._session.post(url, data=form) as resp:
-                    if resp.status in (200, 204, 201):
-                        data = await resp.json()
-                        author = data.get("author") or {}
-                        logger.debug(
-                            f"Discord [{self.instance_id}] webhook sent message "
-                            f"id={data.get('id')} author={author.get('username')!r}"
+                # Wait for text batched before this post; hold later batches.
+                async with self._webhook_turn(webhook_url):
+                    for attempt in range(_WEBHOOK_ATTEMPTS):
+                        form = aiohttp.FormData()
+                        form.add_field(
+                            "payload_json",
+                            orjson.dumps(payload).decode(),
+                            content_type="application/json",
                         )
-                        return str(data.get("id", ""))
-                    body = await resp.text()
-                    logger.error(
-                        f"Discord [{self.instance_id}] webhook error {resp.status}: {body}"
-                    )
+                        for i, (body, mime, fname) in enumerate(files):
+                            form.add_field(
+                                f"files[{i}]", body, filename=fname, content_type=mime
+                            )
+                        async with self._session.post(url, data=form) as resp:
+                            if resp.status in (200, 204, 201):
+                                return await self._webhook_message_id(resp)
+                            # Streamed files are used up by the first attempt.
+                            if (
+                                resp.status == 429
+                                and not streams
+                                and attempt + 1 < _WEBHOOK_ATTEMPTS
+                            ):
+                                delay = _retry_delay(resp, attempt)
+                            else:
+                                body = await resp.text()
+                                logger.error(
+                                    f"Discord [{self.instance_id}] webhook error {resp.status}: {body}"
+                                )
+                                break
+                        logger.warning(
+                            f"Discord [{self.instance_id}] webhook rate limited, "
+                            f"retrying in {delay:.1f}s"
+                        )
+                        await asyncio.sleep(delay)
+            elif self._batcher is not None:
+                return await self._enqueue_webhook(webhook_url, url, payload)
             else:
+                return await self._post_webhook_json(url, payload)
+        except Exception:
+            logger.exception(f"Discord [{self.instance_id}] webhook exception")
+        finally:
+            for stream in streams:
+                stream.close()
+        return None
+
+    async def _post_webhook_json(self, url: str, payload: dict) -> str | None:
+        if self._session is None:
+            return None
+        try:
+            for attempt in range(_WEBHOOK_ATTEMPTS):
                 async with self._session.post(url, json=payload) as resp:
                     if resp.status in (200, 204, 201):
-                        data = await resp.json()
-                        author = data.get("author") or {}
-                        logger.debug(
-                            f"Discord [{self.instance_id}] webhook sent message "
-                            f"id={data.get('id')} author={author.get('username')!r}"
+                        return await self._webhook_message_id(resp)
+                    if resp.status != 429 or attempt + 1 == _WEBHOOK_ATTEMPTS:
+                        body = await resp.text()
+                        logger.error(
+                            f"Discord [{self.instance_id}] webhook error {resp.status}: {body}"
                         )
-                        return str(data.get("id", ""))
-                    body = await resp.text()
-                    logger.error(
-                        f"Discord [{self.instance_id}] webhook error {resp.status}: {body}"
-                    )
+                        return None
+                    delay = _retry_delay(resp, attempt)
+                logger.warning(
+                    f"Discord [{self.instance_id}] webhook rate limited, "
+                    f"retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
         except Exception:
             logger.exception(f"Discord [{self.instance_id}] webhook exception")
         return None
 
+    async def _webhook_message_id(self, resp: aiohttp.ClientResponse) -> str:
+        data = await resp.json(loads=orjson.loads)
+        author = data.get("author") or {}
+        logger.debug(
+            f"Discord [{self.instance_id}] webhook sent message "
+            f"id={data.get('id')} author={author.get('username')!r}"
+        )
+        return str(data.get("id", ""))
+
+    async def _enqueue_webhook(
+        self, webhook_url: str, url: str, payload: dict
+    ) -> str | None:
+        """Hand a text-only post to the batcher and wait for it to be sent."""
+        assert self._batcher is not None  # Type narrowing - checked by caller
+        done: asyncio.Future[str | None] = asyncio.get_running_loop().create_future()
+        self._batcher.put(_webhook_batch_key(webhook_url), (url, payload, done))
+        return await done
+
+    async def _flush_webhook_batch(self, key: str, batch: list[_QueuedWebhook]) -> None:
+        """Post runs of queued messages sharing a username and avatar as one.
+
+        Only the first message of a merged post receives its id, so each
+        Discord message maps back to exactly one bridged message.
+        """
+        try:
+            async with self._webhook_lock(key):
+                url, head, first = batch[0]
+                payload = dict(head)
+                for next_url, item, done in batch[1:]:
+                    merged = f"{payload['content']}\n{item['content']}"
+                    if (
+                        next_url == url
+                        and item.get("username") == payload.get("username")
+                        and item.get("avatar_url") == payload.get("avatar_url")
+                        and len(merged) <= _CONTENT_LIMIT
+                    ):
+                        payload["content"] = merged
+                        continue
+                    _resolve(first, await self._post_webhook_json(url, payload))
+                    url, payload, first = next_url, dict(item), done
+                _resolve(first, await self._post_webhook_json(url, payload))
+        finally:
+            # Merged messages (and any left by an error) get no id.
+            for _, _, done in batch:
+                _resolve(done, None)
+
+    def _drop_webhook_batch(self, key: str, batch: list[_QueuedWebhook]) -> None:
+        """Release senders whose queued post was discarded on shutdown."""
+        for _, _, done in batch:
+            _resolve(done, None)
+
+    def _webhook_lock(self, key: str) -> asyncio.Lock:
+        lock = self._webhook_locks.get(key)
+        if lock is None:
+            lock = self._webhook_locks[key] = asyncio.Lock()
+        return lock
+
+    @asynccontextmanager
+    async def _webhook_turn(self, webhook_url: str | None):
+        """Send slot for a post that bypasses the batcher.
+
+        Text already batched for *webhook_url* is sent first, and batches
+        queued meanwhile wait until this post is out.  No-op when batching is
+        disabled.
+        """
+        if self._batcher is None or webhook_url is None:
+            yield
+            return
+        key = _webhook_batch_key(webhook_url)
+        await self._batcher.drain(key)
+        async with self._webhook_lock(key):
+            yield
+
     async def _send_bot(
         self,
         channel: dict,
@@ -597,22 +891,35 @@ class DiscordDriver(BaseDriver[DiscordConfig]):
 
         discord_files: list[discord.File] = []
         source_proxy = self._source_proxy_from_kwargs(kwargs)
-        for att in attachments or []:
-            if not att.url and att.data is None:
-                continue
-            result = await media.fetch_attachment(
-                att, self.config.max_file_size, source_proxy
-            )
-            if result:
+        pending = [a for a in attachments or [] if a.url or a.data is not None]
+        results = await asyncio.gather(
+            *(
+                media.fetch_attachment(a, self.config.max_file_size, source_proxy)
+                for a in pending
+            ),
+            return_exceptions=True,
+        )
+        fallback_labels: list[str] = []
+        for att, result in zip(pending, results):
+            if isinstance(result, tuple):
                 data_bytes, mime = result
                 fname = media.filename_for(att.name, mime)
+                # discord.File treats raw bytes as a file path, so wrap them;
+                # BytesIO shares the bytes buffer without copying it.
                 discord_files.append(
                     discord.File(io.BytesIO(data_bytes), filename=fname)
                 )
             else:
                 label = att.name or att.url
+                if isinstance(result, BaseException):
+                    logger.warning(
+                        f"Discord [{self.instance_id}] attachment {label} failed: "
+                        f"{result!r}"
+                    )
                 ref = f"({att.url})" if att.url else ""
-                text += f"\n[{att.type.capitalize()}: {label}]{ref}"
+                fallback_labels.append(f"[{_type_label(att.type)}: {label}]{ref}")
+        if fallback_labels:
+            text = "\n".join([text, *fallback_labels])
 
         reply_to_id = kwargs.get("reply_to_id")
         reference = None
@@ -23,18 +23,24 @@
 #   verification_token   – Event verification token  (HTTP mode only)
 #   encrypt_key          – Event encryption key  (HTTP mode; leave "" to disable)
 #   listen_path          – HTTP path for events    (HTTP mode; default: "/event")
+#   max_workers          – Threads for blocking lark-oapi calls  (default: 16)
 #
 # Rule channel keys:
 #   chat_id – Feishu open chat ID, e.g. "oc_xxxxxxxxxxxxxxxxxx"
 
 import asyncio
+import concurrent.futures
+import hashlib
 import io
-import json
 import logging
+import random
 import re
 import threading
+from collections import OrderedDict
+from functools import lru_cache
 
 import lark_oapi as lark
+import orjson
 from fastapi import FastAPI, Request, Response
 from lark_oapi.api.contact.v3 import GetUserRequest
 from lark_oapi.api.im.v1 import (
@@ -54,6 +60,7 @@ from drivers import BaseDriver
 from drivers.registry import register
 from services import media
 from services.config_schema import _DriverConfig
+from services.ingress import IngressQueue
 from services.message import Attachment, NormalizedMessage
 
 
@@ -65,12 +72,69 @@ class FeishuConfig(_DriverConfig):
     encrypt_key: str = ""
     listen_path: str = "/event"
     max_file_size: int = 50 * 1024 * 1024
+    max_workers: int = 16
 
 
 logger = log.get_logger()
 
 _WSS_URL_RE = re.compile(r"wss://\S+")
 
+# Upload keys remembered per instance, so re-bridged stickers and reaction
+# images are not uploaded again.
+_UPLOAD_KEY_CACHE_SIZE = 512
+
+# Incoming events are handled on this many single-thread lanes, chosen by
+# chat, so one chat's messages reach the bridge in the order they arrived.
+_EVENT_LANES = 4
+
+# Open API error code for "request frequency limit exceeded"; such calls are
+# retried with exponential backoff up to this many attempts in total.
+_RATE_LIMITED_CODE = 99991400
+_API_ATTEMPTS = 4
+
+_HANDLED_MSG_TYPES = frozenset(
+    {"text", "post", "image", "file", "audio", "video", "sticker"}
+)
+
+# Event callbacks are small JSON envelopes; anything larger is rejected
+# before it is buffered.
+_MAX_EVENT_BODY = 1 << 20
+
+# The only request headers lark-oapi's dispatcher reads, spelled the way it
+# looks them up (its plain dict lookups are case-sensitive).
+_EVENT_HEADERS = (
+    "X-Lark-Request-Timestamp",
+    "X-Lark-Request-Nonce",
+    "X-Lark-Signature",
+    "X-Request-Id",
+    "Content-Type",
+)
+
+# lark-oapi clients shared by instances using the same app credentials, so
+# they also share its connection pool and tenant access token.
+_clients: dict[tuple[str, str], lark.Client] = {}
+
+
+def _get_client(app_id: str, app_secret: str) -> lark.Client:
+    key = (app_id, app_secret)
+    client = _clients.get(key)
+    if client is None:
+        client = lark.Client.builder().app_id(app_id).app_secret(app_secret).build()
+        _clients[key] = client
+    return client
+
+
+@lru_cache(maxsize=1024)
+def _fallback_label(att_type: str, label: str) -> str:
+    """Text sent in place of an attachment that could not be bridged."""
+    return f"[{att_type.capitalize()}: {label}]"
+
+
+@lru_cache(maxsize=256)
+def _rich_header_prefix(title: str, content: str) -> str:
+    """Bracketed line prepended for a rich header; rules repeat the same few."""
+    return f"[{title}" + (f" · {content}" if content else "") + "]"
+
 
 class _LarkLogBridge(logging.Handler):
     """Forwards lark-oapi WS logs to the system logger, masking wss:// URLs."""
@@ -99,6 +163,22 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
         self._loop: asyncio.AbstractEventLoop | None = None
         # open_id → (display_name, avatar_url)
         self._user_cache: dict[str, tuple[str, str]] = {}
+        # content digest → image_key / file_key, least recently used first
+        self._upload_keys: OrderedDict[bytes, str] = OrderedDict()
+        self._ingress = IngressQueue(f"Feishu [{instance_id}]", bridge.on_message)
+        self._stopped = asyncio.Event()
+        # lark-oapi is synchronous; keep its calls off the shared default
+        # executor so slow uploads do not stall unrelated blocking work.
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=config.max_workers,
+            thread_name_prefix=f"feishu-{instance_id}",
+        )
+        self._event_lanes = [
+            concurrent.futures.ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"feishu-{instance_id}-event{i}"
+            )
+            for i in range(_EVENT_LANES)
+        ]
 
     # ------------------------------------------------------------------
     # Lifecycle
@@ -107,14 +187,10 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
     async def start(self):
         self.bridge.register_sender(self.instance_id, self.send)
         self._loop = asyncio.get_running_loop()
+        self._ingress.start()
 
         # Client for outgoing API calls
-        self._client = (
-            lark.Client.builder()
-            .app_id(self.config.app_id)
-            .app_secret(self.config.app_secret)
-            .build()
-        )
+        self._client = _get_client(self.config.app_id, self.config.app_secret)
 
         # Event dispatcher shared by both receive modes
         self._handler = (
@@ -126,10 +202,22 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
             .build()
         )
 
-        if self.config.use_long_connection:
-            await self._start_long_connection()
-        else:
-            await self._start_http_server()
+        try:
+            if self.config.use_long_connection:
+                await self._start_long_connection()
+            else:
+                await self._start_http_server()
+        except asyncio.CancelledError:
+            # Cancellation bypasses stop(); release resources here too.
+            await self.stop()
+            raise
+
+    async def stop(self):
+        self._stopped.set()
+        self._ingress.stop()
+        self._executor.shutdown(wait=False)
+        for lane in self._event_lanes:
+            lane.shutdown(wait=False)
 
     # ------------------------------------------------------------------
     # Receive — long connection (WebSocket) mode
@@ -149,7 +237,9 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
 
             thread_loop = asyncio.new_event_loop()
             asyncio.set_event_loop(thread_loop)
-            _ws_mod.loop = thread_loop  # patch module-level loop reference
+            # lark_oapi.ws.client captures a module-level loop at import time,
+            # which is the bridge's running loop; point it at ours instead.
+            _ws_mod.loop = thread_loop
 
             # Redirect the lark-oapi "Lark" logger to the system logger.
             lark_logger = logging.getLogger("Lark")
@@ -179,7 +269,7 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
             f"Feishu [{self.instance_id}] WebSocket long connection thread started"
         )
         # Block the coroutine so the driver stays alive (mirrors HTTP mode).
-        await asyncio.Event().wait()
+        await self._stopped.wait()
 
     # ------------------------------------------------------------------
     # Receive — HTTP webhook mode
@@ -197,21 +287,34 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
         self.http_server.mount(self.instance_id, path, app)
         logger.info(f"Feishu [{self.instance_id}] HTTP webhook mounted at {path}")
 
-        await asyncio.Event().wait()
+        await self._stopped.wait()
 
     async def _handle_http(self, request: Request) -> Response:
         assert self._handler is not None  # Type narrowing - handler is set in start()
         handler = self._handler
-        body = await request.body()
+        cl = request.headers.get("content-length")
+        if cl and cl.isdigit() and int(cl) > _MAX_EVENT_BODY:
+            return Response(status_code=413)
+        buf = bytearray()
+        async for chunk in request.stream():
+            buf += chunk
+            if len(buf) > _MAX_EVENT_BODY:
+                return Response(status_code=413)
+        body = bytes(buf)
         # Create RawRequest with correct parameter names for lark-oapi
         raw_req = lark.RawRequest()
         raw_req.uri = request.url.path
-        raw_req.headers = dict(request.headers)
+        raw_req.headers = {
+            name: value
+            for name in _EVENT_HEADERS
+            if (value := request.headers.get(name)) is not None
+        }
         raw_req.body = body
 
         # lark-oapi's do() is synchronous; run in thread pool to avoid blocking
-        loop = asyncio.get_running_loop()
-        resp = await loop.run_in_executor(None, lambda: handler.do(raw_req))
+        loop = self._loop
+        assert loop is not None  # Type narrowing - loop is set in start()
+        resp = await loop.run_in_executor(self._executor, handler.do, raw_req)
         return Response(
             content=resp.content,
             status_code=resp.status_code or 200,
@@ -313,14 +416,32 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
         return None
 
     def _on_message_event(self, data) -> None:
-        """Synchronous callback invoked by lark-oapi inside the executor thread."""
+        """Synchronous callback invoked by lark-oapi.
+
+        In long-connection mode this runs on the WebSocket thread's event
+        loop, so the blocking user-info and resource fetches are handed to
+        a worker thread to keep pings and acks flowing.  Each chat always
+        maps to the same single-thread lane, which keeps its order.
+        """
+        chat_id = getattr(getattr(data.event, "message", None), "chat_id", "")
+        lane = self._event_lanes[hash(chat_id) % _EVENT_LANES]
+        try:
+            lane.submit(self._handle_message_event, data)
+        except RuntimeError:
+            pass  # executor shut down by stop()
+
+    def _handle_message_event(self, data) -> None:
         try:
             event = data.event
             msg = event.message
             sender = event.sender
 
             mtype = msg.message_type
-            content_json = json.loads(msg.content)
+            # Other types (cards, system notices, ...) are dropped anyway, so
+            # don't pay for parsing their content.
+            if mtype not in _HANDLED_MSG_TYPES or not msg.content:
+                return
+            content_json = orjson.loads(msg.content)
             text = ""
             attachments = []
             mentions = []
@@ -394,9 +515,7 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
             )
 
             if self._loop:
-                asyncio.run_coroutine_threadsafe(
-                    self.bridge.on_message(normalized), self._loop
-                )
+                self._loop.call_soon_threadsafe(self._ingress.put, normalized)
         except Exception as e:
             logger.error(f"Feishu [{self.instance_id}] event parse error: {e}")
 
@@ -426,8 +545,9 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
 
         rich_header = kwargs.get("rich_header")
         if rich_header:
-            t, c = rich_header.get("title", ""), rich_header.get("content", "")
-            prefix = f"[{t}" + (f" · {c}" if c else "") + "]"
+            prefix = _rich_header_prefix(
+                rich_header.get("title", ""), rich_header.get("content", "")
+            )
             text = f"{prefix}\n{text}" if text else prefix
 
         # Handle mentions in outgoing text
@@ -436,72 +556,91 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
             # Feishu mention format: <at user_id="ou_xxxxxx"></at>
             text = text.replace(f"@{m['name']}", f'<at user_id="{m["id"]}"></at>')
 
-        if text.strip():
+        source_proxy = self._source_proxy_from_kwargs(kwargs)
+
+        # Download and upload all attachments concurrently before sending.
+        pending = [a for a in attachments or [] if a.url or a.data is not None]
+        prepared = await asyncio.gather(
+            *(self._prepare_attachment(a, source_proxy) for a in pending)
+        )
+
+        # Text, images and fallback labels fit in one rich-text post instead
+        # of a message each; uploaded files still follow on their own.  Post
+        # text segments do not render <at> tags, so mentions keep the
+        # plain text message.
+        has_text = bool(text.strip())
+        inline = [(t, c) for t, c in prepared if t in ("image", "text")]
+        outgoing: list[tuple[str, dict]]
+        if (
+            any(t == "image" for t, _ in inline)
+            and has_text + len(inline) > 1
+            and not mentions
+        ):
+            rows = [[{"tag": "text", "text": text}]] if has_text else []
+            rows += [
+                [{"tag": "img", "image_key": c["image_key"]}]
+                if t == "image"
+                else [{"tag": "text", "text": c["text"]}]
+                for t, c in inline
+            ]
+            outgoing = [("post", {"zh_cn": {"content": rows}})]
+            outgoing += [(t, c) for t, c in prepared if t not in ("image", "text")]
+        else:
+            outgoing = [("text", {"text": text})] if has_text else []
+            outgoing += prepared
+
+        for msg_type, content in outgoing:
             mid = await self._send_feishu_msg(
-                chat_id, "text", json.dumps({"text": text}), reply_to_id
+                chat_id, msg_type, orjson.dumps(content).decode(), reply_to_id
             )
             if not first_msg_id:
                 first_msg_id = mid
 
-        source_proxy = self._source_proxy_from_kwargs(kwargs)
+        return first_msg_id
 
-        for att in attachments or []:
-            if not att.url and att.data is None:
-                continue
-            result = await media.fetch_attachment(
-                att, self.config.max_file_size, source_proxy
-            )
-            if not result:
-                label = att.name or att.url or ""
-                mid = await self._send_feishu_msg(
-                    chat_id,
-                    "text",
-                    json.dumps({"text": f"[{att.type.capitalize()}: {label}]"}),
-                    reply_to_id,
-                )
-                if not first_msg_id:
-                    first_msg_id = mid
-                continue
-
-            data_bytes, mime = result
-            fname = media.filename_for(att.name, mime)
-
-            if mime.startswith("image/"):
-                key = await self._upload_image(data_bytes)
-                if key:
-                    mid = await self._send_feishu_msg(
-                        chat_id, "image", json.dumps({"image_key": key}), reply_to_id
-                    )
-                    if not first_msg_id:
-                        first_msg_id = mid
-                else:
-                    mid = await self._send_feishu_msg(
-                        chat_id,
-                        "text",
-                        json.dumps({"text": f"[Image: {fname}]"}),
-                        reply_to_id,
-                    )
-                    if not first_msg_id:
-                        first_msg_id = mid
-            else:
-                key = await self._upload_file(data_bytes, fname)
-                if key:
-                    mid = await self._send_feishu_msg(
-                        chat_id, "file", json.dumps({"file_key": key}), reply_to_id
-                    )
-                    if not first_msg_id:
-                        first_msg_id = mid
-                else:
-                    mid = await self._send_feishu_msg(
-                        chat_id,
-                        "text",
-                        json.dumps({"text": f"[{att.type.capitalize()}: {fname}]"}),
-                        reply_to_id,
-                    )
-                    if not first_msg_id:
-                        first_msg_id = mid
+    async def _prepare_attachment(
+        self, att: Attachment, source_proxy: str | None
+    ) -> tuple[str, dict]:
+        """Fetch and upload *att*; return the (msg_type, content) to send.
 
-        return first_msg_id
+        Falls back to a text label when the download or upload fails.
+        """
+        result = await media.fetch_attachment(
+            att, self.config.max_file_size, source_proxy
+        )
+        if not result:
+            label = att.name or att.url or ""
+            return "text", {"text": _fallback_label(att.type, label)}
+
+        data_bytes, mime = result
+        fname = media.filename_for(att.name, mime)
+
+        if mime.startswith("image/"):
+            key = await self._upload_image(data_bytes)
+            if key:
+                return "image", {"image_key": key}
+            return "text", {"text": _fallback_label("image", fname)}
+
+        key = await self._upload_file(data_bytes, fname)
+        if key:
+            return "file", {"file_key": key}
+        return "text", {"text": _fallback_label(att.type, fname)}
+
+    async def _call_api(self, call, *args):
+        """Run a blocking lark-oapi ``call(*args)`` on the executor, retrying
+        it with backoff while Feishu answers with its rate-limit code."""
+        loop = self._loop
+        assert loop is not None  # Type narrowing - loop is set in start()
+        for attempt in range(_API_ATTEMPTS - 1):
+            resp = await loop.run_in_executor(self._executor, call, *args)
+            if resp.code != _RATE_LIMITED_CODE:
+                return resp
+            delay = 2.0**attempt + random.uniform(0, 0.5)
+            logger.warning(
+                f"Feishu [{self.instance_id}] rate limited, retrying in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+        return await loop.run_in_executor(self._executor, call, *args)
 
     async def _send_feishu_msg(
         self, chat_id: str, msg_type: str, content: str, reply_to_id: str | None = None
@@ -510,7 +649,6 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
         assert self._client.im is not None
         im = self._client.im
 
-        loop = asyncio.get_running_loop()
         try:
             if reply_to_id:
                 reply_req = (
@@ -524,9 +662,7 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
                     )
                     .build()
                 )
-                resp = await loop.run_in_executor(
-                    None, lambda: im.v1.message.reply(reply_req)
-                )
+                resp = await self._call_api(im.v1.message.reply, reply_req)
             else:
                 create_req = (
                     CreateMessageRequest.builder()
@@ -540,9 +676,7 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
                     )
                     .build()
                 )
-                resp = await loop.run_in_executor(
-                    None, lambda: im.v1.message.create(create_req)
-                )
+                resp = await self._call_api(im.v1.message.create, create_req)
 
             if resp.success() and resp.data is not None:
                 return resp.data.message_id
@@ -555,21 +689,38 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
             logger.error(f"Feishu [{self.instance_id}] send error: {e}")
         return None
 
+    def _cached_upload_key(self, digest: bytes) -> str | None:
+        key = self._upload_keys.get(digest)
+        if key is not None:
+            self._upload_keys.move_to_end(digest)
+        return key
+
+    def _remember_upload_key(self, digest: bytes, key: str) -> None:
+        self._upload_keys[digest] = key
+        if len(self._upload_keys) > _UPLOAD_KEY_CACHE_SIZE:
+            self._upload_keys.popitem(last=False)
+
     async def _upload_image(self, data: bytes) -> str | None:
+        digest = hashlib.blake2b(data, digest_size=16, person=b"image").digest()
+        if (cached := self._cached_upload_key(digest)) is not None:
+            return cached
+
         assert self._client is not None  # Type narrowing - client is set in start()
         assert self._client.im is not None
         im = self._client.im
-        body = (
-            CreateImageRequestBody.builder()
-            .image_type("message")
-            .image(io.BytesIO(data))
-            .build()
-        )
+        buf = io.BytesIO(data)
+        body = CreateImageRequestBody.builder().image_type("message").image(buf).build()
         req = CreateImageRequest.builder().request_body(body).build()
-        loop = asyncio.get_running_loop()
+
+        def create():
+            buf.seek(0)  # rewind for retries
+            return im.v1.image.create(req)
+
         try:
-            resp = await loop.run_in_executor(None, lambda: im.v1.image.create(req))
+            resp = await self._call_api(create)
             if resp.success() and resp.data is not None:
+                if resp.data.image_key:
+                    self._remember_upload_key(digest, resp.data.image_key)
                 return resp.data.image_key
             logger.error(
                 f"Feishu [{self.instance_id}] image upload failed: "
@@ -580,21 +731,35 @@ class FeishuDriver(BaseDriver[FeishuConfig]):
         return None
 
     async def _upload_file(self, data: bytes, fname: str) -> str | None:
+        # The file name is part of the uploaded file, so it is part of the key.
+        h = hashlib.blake2b(data, digest_size=16, person=b"file")
+        h.update(fname.encode())
+        digest = h.digest()
+        if (cached := self._cached_upload_key(digest)) is not None:
+            return cached
+
         assert self._client is not None  # Type narrowing - client is set in start()
         assert self._client.im is not None
         im = self._client.im
+        buf = io.BytesIO(data)
         body = (
             CreateFileRequestBody.builder()
             .file_type("stream")
             .file_name(fname)
-            .file(io.BytesIO(data))
+            .file(buf)
             .build()
         )
         req = CreateFileRequest.builder().request_body(body).build()
-        loop = asyncio.get_running_loop()
+
+        def create():
+            buf.seek(0)  # rewind for retries
+            return im.v1.file.create(req)
+
         try:
-            resp = await loop.run_in_executor(None, lambda: im.v1.file.create(req))
+            resp = await self._call_api(create)
             if resp.success() and resp.data is not None:
+                if resp.data.file_key:
+                    self._remember_upload_key(digest, resp.data.file_key)
                 return resp.data.file_key
             logger.error(
                 f"Feishu [{self.instance_id}] file upload failed: "
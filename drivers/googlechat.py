@@ -19,6 +19,10 @@
 #                          Google's signed OIDC token.  Safe to omit in
 #                          dev / behind a firewall.
 #   max_file_size        – Max bytes per attachment (default: 50 MB)
+#   batch_window_ms      – Collect messages bound for the same space for this
+#                          long and post their texts as one message
+#                          (default: 0, disabled)
+#   batch_max            – Max messages merged into one batch (default: 10)
 #
 # Rule channel keys:
 #   space_name – Google Chat space resource name, e.g. "spaces/AAAA"
@@ -26,16 +30,20 @@
 # * Exactly one of service_account_file or service_account_json is required.
 
 import asyncio
-import json
+import hashlib
+import io
+import time
+from collections import OrderedDict
+from datetime import UTC, datetime
 from pathlib import Path
 
 import aiohttp
 import google.auth.transport.requests as _ga_req
 import google.oauth2.service_account as _sa
+import orjson
 import requests
-from aiohttp_socks import ProxyConnector
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.responses import PlainTextResponse, Response
 from pydantic import model_validator
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -44,8 +52,10 @@ import services.logger as log
 from drivers import BaseDriver
 from drivers.registry import register
 from services import media
+from services.batching import SendBatcher
 from services.config import UNSET, get_proxy
 from services.config_schema import _DriverConfig
+from services.ingress import IngressQueue
 from services.message import Attachment, NormalizedMessage
 
 
@@ -56,6 +66,8 @@ class GoogleChatConfig(_DriverConfig):
     endpoint_url: str = ""
     max_file_size: int = 50 * 1024 * 1024
     proxy: str | None = UNSET
+    batch_window_ms: int = 0
+    batch_max: int = 10
 
     @model_validator(mode="after")
     def _require_creds(self) -> "GoogleChatConfig":
@@ -71,15 +83,44 @@ logger = log.get_logger()
 _SCOPES = ["https://www.googleapis.com/auth/chat.bot"]
 _API_BASE = "https://chat.googleapis.com/v1"
 
+# A cached access token is refreshed once it has less than this many seconds
+# left; tokens without a reported expiry are kept for 55 minutes.
+_TOKEN_REFRESH_MARGIN = 300
+_TOKEN_DEFAULT_TTL = 3300
+
+# Verified inbound ID tokens remembered per instance, and how long before
+# their expiry they stop being trusted without a fresh check.
+_VERIFIED_TOKEN_CACHE_SIZE = 1024
+_VERIFIED_TOKEN_MARGIN = 60
+
+# (text, attachments, source_proxy) of a send() held back for batching
+_QueuedSend = tuple[str, list[Attachment], str | None]
+
+# Media uploads send an empty metadata part followed by the file itself.
+_UPLOAD_BOUNDARY = "gc_nb_boundary"
+_EMPTY_METADATA = b"{}"
+
+
+# Empty synchronous reply to a Google Chat event, pre-encoded.
+_EMPTY_ACK_BODY = b'{"text":""}'
+
+
+def _empty_ack() -> Response:
+    return Response(content=_EMPTY_ACK_BODY, media_type="application/json")
+
+
+def _looks_like_object(body: bytes) -> bool:
+    """Cheap sanity check that *body* is a JSON object, without parsing it."""
+    body = body.strip()
+    return body.startswith(b"{") and body.endswith(b"}")
+
+
+# MIME top-level type → Attachment.type; anything else is a plain file.
+_MIME_PREFIX_TO_ATT_TYPE = {"image": "image", "video": "video", "audio": "voice"}
+
 
 def _mime_to_att_type(mime: str) -> str:
-    if mime.startswith("image/"):
-        return "image"
-    if mime.startswith("video/"):
-        return "video"
-    if mime.startswith("audio/"):
-        return "voice"
-    return "file"
+    return _MIME_PREFIX_TO_ATT_TYPE.get(mime.partition("/")[0], "file")
 
 
 class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
@@ -88,7 +129,25 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
         self._session: aiohttp.ClientSession | None = None
         self._creds: _sa.Credentials | None = None
         self._token_lock: asyncio.Lock = asyncio.Lock()
+        # (Authorization header built from the access token, time.monotonic()
+        # deadline after which the token is refreshed)
+        self._token_cache: tuple[dict[str, str], float] | None = None
         self._proxy = get_proxy(config.proxy)
+        # google-auth transport for token refresh and ID token checks; built
+        # in start() and closed when the driver stops.
+        self._auth_session: requests.Session | None = None
+        self._ga_request: _ga_req.Request | None = None
+        # blake2b(token) -> "exp" claim of ID tokens that passed verification
+        self._verified_tokens: OrderedDict[bytes, float] = OrderedDict()
+        self._ingress = IngressQueue(f"Google Chat [{instance_id}]", bridge.on_message)
+        self._batcher: SendBatcher[_QueuedSend] | None = None
+        if config.batch_window_ms > 0:
+            self._batcher = SendBatcher(
+                f"Google Chat [{instance_id}]",
+                self._flush_batch,
+                config.batch_window_ms / 1000,
+                config.batch_max,
+            )
 
     # ------------------------------------------------------------------
     # Lifecycle
@@ -96,16 +155,15 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
 
     async def start(self):
         if self._proxy:
-            connector = ProxyConnector.from_url(self._proxy, rdns=True)
             logger.info(f"GoogleChat [{self.instance_id}] use proxy {self._proxy}")
-        else:
-            connector = aiohttp.TCPConnector(ssl=True)
 
         try:
             if self.config.service_account_json:
-                sa_info = json.loads(self.config.service_account_json)
+                sa_info = orjson.loads(self.config.service_account_json)
             else:
-                sa_info = json.loads(Path(self.config.service_account_file).read_text())
+                sa_info = orjson.loads(
+                    Path(self.config.service_account_file).read_bytes()
+                )
             self._creds = _sa.Credentials.from_service_account_info(
                 sa_info, scopes=_SCOPES
             )
@@ -115,16 +173,21 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
             )
             return
 
-        self._session = aiohttp.ClientSession(connector=connector)
-        self.bridge.register_sender(self.instance_id, self.send)
-
-        app = FastAPI()
-        app.add_api_route("/", self._handle_event, methods=["POST"])
         if self.http_server is None:
             logger.error(
                 f"Google Chat [{self.instance_id}] shared HTTP server unavailable"
             )
             return
+
+        # Shared keep-alive pool for the Chat API, uploads and downloads.
+        self._session = media.get_session(self._proxy)
+        self._auth_session = self._build_auth_session()
+        self._ga_request = _ga_req.Request(session=self._auth_session)
+        self.bridge.register_sender(self.instance_id, self.send)
+
+        app = FastAPI()
+        app.add_api_route("/", self._handle_event, methods=["POST"])
+        self._ingress.start()
         self.http_server.mount(self.instance_id, self.config.listen_path, app)
         logger.info(
             f"Google Chat [{self.instance_id}] webhook mounted at {self.config.listen_path}"
@@ -132,64 +195,84 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
         try:
             await asyncio.Event().wait()
         finally:
-            await self._session.close()
-            self._session = None
+            self._ingress.stop()
+            self._auth_session.close()
+            if self._batcher is not None:
+                self._batcher.stop()
 
     # ------------------------------------------------------------------
     # Auth
     # ------------------------------------------------------------------
 
-    async def _get_token(self) -> str:
+    async def _auth_headers(self) -> dict[str, str]:
+        """Return the Authorization header for API calls, refreshing the token
+        when needed, or an empty dict if no token could be obtained.
+
+        The dict is shared between calls and must not be modified.
+        """
+        # Fast path: a cached token that is not close to expiry needs no lock.
+        cached = self._token_cache
+        if cached is not None and time.monotonic() < cached[1]:
+            return cached[0]
+
         async with self._token_lock:
-            if self._creds is None:
-                return ""
-
-            if not self._creds.valid:
-                session: requests.Session | None = None
-                try:
-                    session = requests.Session()
-                    if self._proxy:
-                        session.proxies = {
-                            "http": self._proxy,
-                            "https": self._proxy,
-                        }
-                        logger.debug(
-                            f"GoogleChat [{self.instance_id}] token refresh use proxy {self._proxy}"
-                        )
-
-                    # retry
-                    retry_strategy = Retry(
-                        total=3,
-                        backoff_factor=1,
-                        status_forcelist=[429, 500, 502, 503, 504],
-                    )
-                    adapter = HTTPAdapter(max_retries=retry_strategy)
-                    session.mount("http://", adapter)
-                    session.mount("https://", adapter)
+            cached = self._token_cache
+            if cached is not None and time.monotonic() < cached[1]:
+                return cached[0]
+            if self._creds is None or self._ga_request is None:
+                return {}
+
+            try:
+                await asyncio.to_thread(self._creds.refresh, self._ga_request)
+                logger.debug(f"Google Chat [{self.instance_id}] access token refreshed")
+            except Exception as e:
+                logger.error(
+                    f"Google Chat [{self.instance_id}] token refresh failed: {e}"
+                )
+                return {}
 
-                    # refresh token manually
-                    request = _ga_req.Request(session=session)
-                    await asyncio.to_thread(self._creds.refresh, request)
+            if not self._creds.token:
+                return {}
+            headers = {"Authorization": f"Bearer {self._creds.token}"}
+            self._token_cache = (headers, self._token_deadline())
+            return headers
 
-                    logger.debug(
-                        f"Google Chat [{self.instance_id}] access token refreshed"
-                    )
-                except Exception as e:
-                    logger.error(
-                        f"Google Chat [{self.instance_id}] token refresh failed: {e}"
-                    )
-                    return ""
-                finally:
-                    if session is not None:
-                        session.close()
+    def _build_auth_session(self) -> requests.Session:
+        """Session for google-auth calls: token refresh and ID token checks.
 
-            return self._creds.token or ""
+        Kept for the driver's lifetime so those requests reuse connections.
+        """
+        session = requests.Session()
+        if self._proxy:
+            session.proxies = {"http": self._proxy, "https": self._proxy}
+            logger.debug(
+                f"GoogleChat [{self.instance_id}] auth requests use proxy {self._proxy}"
+            )
+        retry_strategy = Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+        )
+        adapter = HTTPAdapter(max_retries=retry_strategy)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _token_deadline(self) -> float:
+        """Monotonic time at which the current access token should be renewed."""
+        assert self._creds is not None  # Type narrowing - creds are set in start()
+        ttl = float(_TOKEN_DEFAULT_TTL)
+        if self._creds.expiry is not None:
+            # google-auth reports expiry as a naive UTC datetime
+            now = datetime.now(UTC).replace(tzinfo=None)
+            ttl = (self._creds.expiry - now).total_seconds()
+        return time.monotonic() + ttl - _TOKEN_REFRESH_MARGIN
 
     # ------------------------------------------------------------------
     # Receive
     # ------------------------------------------------------------------
 
-    async def _handle_event(self, request: Request) -> JSONResponse | PlainTextResponse:
+    async def _handle_event(self, request: Request) -> Response:
         if self.config.endpoint_url:
             auth = request.headers.get("Authorization", "")
             if not auth.startswith("Bearer "):
@@ -199,22 +282,27 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
 
         try:
             body = await request.body()
-            event = json.loads(body)
-        except json.JSONDecodeError:
+            # Lifecycle events (ADDED_TO_SPACE, ...) never contain the MESSAGE
+            # type string; acknowledge them without decoding the body.  Bodies
+            # that are not even a JSON object still get the 400 below.
+            if b'"MESSAGE"' not in body and _looks_like_object(body):
+                return _empty_ack()
+            event = orjson.loads(body)
+        except orjson.JSONDecodeError:
             return PlainTextResponse("Bad JSON", status_code=400)
         except Exception:
             return PlainTextResponse("Receive Failed", status_code=500)
 
         if event.get("type") != "MESSAGE":
             # Acknowledge other events (ADDED_TO_SPACE, REMOVED_FROM_SPACE...)
-            return JSONResponse({"text": ""})
+            return _empty_ack()
 
         message = event.get("message", {})
         sender = message.get("sender", {})
         space = event.get("space", {})
 
         if sender.get("type") == "BOT":
-            return JSONResponse({"text": ""})
+            return _empty_ack()
 
         # argumentText strips the @mention prefix; fall back to full text
         text: str = message.get("argumentText") or message.get("text") or ""
@@ -241,14 +329,17 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
                         if uname:
                             text = text.replace(f"<{uid}>", f"@{uname}")
 
-        attachments: list[Attachment] = []
-        for att_raw in message.get("attachments", []):
-            att = await self._download_attachment(att_raw, self.config.max_file_size)
-            if att is not None:
-                attachments.append(att)
+        # Downloads are independent, so fetch them concurrently.
+        downloaded = await asyncio.gather(
+            *(
+                self._download_attachment(att_raw, self.config.max_file_size)
+                for att_raw in message.get("attachments", [])
+            )
+        )
+        attachments = [att for att in downloaded if att is not None]
 
         if not text.strip() and not attachments:
-            return JSONResponse({"text": ""})
+            return _empty_ack()
 
         normalized = NormalizedMessage(
             platform="googlechat",
@@ -262,20 +353,36 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
             mentions=mentions,
             source_proxy=self._media_proxy,
         )
-        asyncio.create_task(self.bridge.on_message(normalized))
-        return JSONResponse({"text": ""})
+        if not self._ingress.put(normalized):
+            # Queue is full: let Google Chat retry later.
+            return PlainTextResponse("Busy", status_code=429)
+        return _empty_ack()
 
     async def _verify_token(self, token: str) -> bool:
         import google.oauth2.id_token as _id_token
 
+        assert self._ga_request is not None  # Type narrowing - set in start()
+        # Google Chat reuses a signed token for many requests; skip the RSA
+        # check for one already accepted that is not about to expire.
+        digest = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        exp = self._verified_tokens.get(digest)
+        if exp is not None and time.time() < exp - _VERIFIED_TOKEN_MARGIN:
+            self._verified_tokens.move_to_end(digest)
+            return True
+
         try:
             info = await asyncio.to_thread(
                 _id_token.verify_oauth2_token,
                 token,
-                _ga_req.Request(),
+                self._ga_request,
                 self.config.endpoint_url,
             )
-            return info.get("email") == "chat@system.gserviceaccount.com"
+            if info.get("email") != "chat@system.gserviceaccount.com":
+                return False
+            self._verified_tokens[digest] = float(info.get("exp", 0))
+            if len(self._verified_tokens) > _VERIFIED_TOKEN_CACHE_SIZE:
+                self._verified_tokens.popitem(last=False)
+            return True
         except Exception as e:
             logger.warning(
                 f"Google Chat [{self.instance_id}] request verification failed: {e}"
@@ -295,16 +402,25 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
                 type=att_type, url=download_uri, name=name, size=-1, data=None
             )
 
-        token = await self._get_token()
-        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        headers = await self._auth_headers()
         try:
             async with self._session.get(download_uri, headers=headers) as resp:
                 if resp.status != 200:
                     return Attachment(
                         type=att_type, url=download_uri, name=name, size=-1, data=None
                     )
-                data = await resp.read()
-                if len(data) > max_size:
+                # Stop reading as soon as the limit is passed instead of
+                # buffering the whole body first.
+                cl = resp.content_length
+                oversized = cl is not None and cl > max_size
+                buf = io.BytesIO()
+                if not oversized:
+                    async for chunk in resp.content.iter_chunked(65536):
+                        buf.write(chunk)
+                        if buf.tell() > max_size:
+                            oversized = True
+                            break
+                if oversized:
                     logger.debug(
                         f"Google Chat [{self.instance_id}] attachment "
                         f"{name!r} exceeds size limit, skipping data"
@@ -313,9 +429,10 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
                         type=att_type,
                         url=download_uri,
                         name=name,
-                        size=len(data),
+                        size=cl if cl is not None else -1,
                         data=None,
                     )
+                data = buf.getvalue()
                 return Attachment(
                     type=att_type, url="", name=name, size=len(data), data=data
                 )
@@ -336,6 +453,7 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
         channel: dict,
         text: str,
         attachments: list[Attachment] | None = None,
+        rich_header: dict | None = None,
         **kwargs,
     ):
         reply_to_id = kwargs.get("reply_to_id")
@@ -356,20 +474,6 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
         if not space_name.startswith("spaces/"):
             space_name = f"spaces/{space_name}"
 
-        token = await self._get_token()
-        if not token:
-            logger.error(
-                f"Google Chat [{self.instance_id}] send: could not obtain access token"
-            )
-            return
-
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-        }
-        api_url = f"{_API_BASE}/{space_name}/messages"
-
-        rich_header = kwargs.get("rich_header")
         if rich_header:
             t, c = rich_header.get("title", ""), rich_header.get("content", "")
             prefix = f"*{t}*" + (f" · _{c}_" if c else "")
@@ -384,17 +488,60 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
             # Google Chat mention format: <users/12345>
             text = text.replace(f"@{m['name']}", f"<{m['id']}>")
 
+        source_proxy = self._source_proxy_from_kwargs(kwargs)
+        if self._batcher is not None:
+            self._batcher.put(space_name, (text, attachments or [], source_proxy))
+            return
+        await self._deliver(space_name, text, attachments or [], source_proxy)
+
+    async def _flush_batch(self, space_name: str, batch: list[_QueuedSend]) -> None:
+        """Post a batch of queued sends: all texts as one message, then each
+        send's attachments in order."""
+        text = "\n\n".join(t for t, _, _ in batch if t.strip())
+        await self._deliver(space_name, text, [], None)
+        for _, attachments, source_proxy in batch:
+            if attachments:
+                await self._deliver(space_name, "", attachments, source_proxy)
+
+    async def _deliver(
+        self,
+        space_name: str,
+        text: str,
+        attachments: list[Attachment],
+        source_proxy: str | None,
+    ) -> None:
+        if not text.strip() and not attachments:
+            return
+
+        headers = await self._auth_headers()
+        if not headers:
+            logger.error(
+                f"Google Chat [{self.instance_id}] send: could not obtain access token"
+            )
+            return
+
+        api_url = f"{_API_BASE}/{space_name}/messages"
+
         if text.strip():
             await self._post_message(api_url, headers, {"text": text})
 
-        source_proxy = self._source_proxy_from_kwargs(kwargs)
-
-        for att in attachments or []:
-            if not att.url and att.data is None:
-                continue
+        pending = [att for att in attachments if att.url or att.data is not None]
+        # Images with a public URL → card widget (renders inline, no upload
+        # needed).  Everything else is fetched for upload; fetch those
+        # concurrently up front, then post in the original order.
+        as_card = [att.type == "image" and bool(att.url) for att in pending]
+        fetched = iter(
+            await asyncio.gather(
+                *(
+                    media.fetch_attachment(att, self.config.max_file_size, source_proxy)
+                    for att, card in zip(pending, as_card, strict=True)
+                    if not card
+                )
+            )
+        )
 
-            # Images with a public URL → card widget (renders inline, no upload needed)
-            if att.type == "image" and att.url:
+        for att, card in zip(pending, as_card, strict=True):
+            if card:
                 await self._post_message(
                     api_url,
                     headers,
@@ -423,9 +570,7 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
                 continue
 
             # All other attachments (or images with bytes only) → multipart upload
-            result = await media.fetch_attachment(
-                att, self.config.max_file_size, source_proxy
-            )
+            result = next(fetched)
             if not result:
                 label = att.name or att.url or ""
                 await self._post_message(
@@ -447,26 +592,17 @@ class GoogleChatDriver(BaseDriver[GoogleChatConfig]):
     ) -> None:
         """Upload a file via the Google Chat multipart media upload endpoint."""
         assert self._session is not None  # Type narrowing - session is set in start()
-        boundary = "gc_nb_boundary"
-        meta = json.dumps({}).encode()
-        body = (
-            f"--{boundary}\r\nContent-Type: application/json\r\n\r\n".encode()
-            + meta
-            + f"\r\n--{boundary}\r\nContent-Type: {mime}\r\n"
-            f"Content-Transfer-Encoding: binary\r\n\r\n".encode()
-            + data_bytes
-            + f"\r\n--{boundary}--".encode()
-        )
+        # MultipartWriter wraps data_bytes as a payload instead of copying it
+        # into one concatenated body, and still sends a Content-Length.
+        body = aiohttp.MultipartWriter("related", boundary=_UPLOAD_BOUNDARY)
+        body.append(_EMPTY_METADATA, {"Content-Type": "application/json"})
+        body.append(data_bytes, {"Content-Type": mime})
         upload_url = f"https://upload.googleapis.com/upload/v1/{space_name}/messages"
-        upload_headers = {
-            "Authorization": headers["Authorization"],
-            "Content-Type": f"multipart/related; boundary={boundary}",
-        }
         try:
             async with self._session.post(
                 upload_url,
                 data=body,
-                headers=upload_headers,
+                headers=headers,
                 params={"uploadType": "multipart"},
             ) as resp:
                 if resp.status not in (200, 201):
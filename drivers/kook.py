@@ -10,12 +10,20 @@
 # Config keys (under kook.<instance_id>):
 #   token         – KOOK bot token (required)
 #   max_file_size – Max bytes per attachment when uploading (default 25 MB)
+#   batch_window_ms – Collect messages bound for the same channel for this
+#                     long and send them as one, separated by dividers
+#                     (default 0, disabled)
+#   batch_max     – Max messages merged into one batch (default 10)
 #
 # Rule channel keys:
 #   channel_id – KOOK text channel ID
 
 import io
 import re
+import time
+from collections import OrderedDict
+from itertools import groupby
+from urllib.parse import urlsplit
 
 import khl
 from aiohttp import ClientSession
@@ -25,9 +33,11 @@ import services.logger as log
 from drivers import BaseDriver
 from drivers.registry import register
 from services import media
+from services.batching import SendBatcher
 from services.config import UNSET, get_proxy
 from services.config_schema import _DriverConfig
 from services.db import msg_db
+from services.ingress import IngressQueue
 from services.message import Attachment, NormalizedMessage
 
 
@@ -35,16 +45,44 @@ class KookConfig(_DriverConfig):
     token: str
     max_file_size: int = 25 * 1024 * 1024
     proxy: str | None = UNSET
+    batch_window_ms: int = 0
+    batch_max: int = 10
 
 
 logger = log.get_logger()
 
+# Hosts of KOOK's own asset CDN; files already there are linked, not re-uploaded.
+_KOOK_ASSET_HOSTS = frozenset({"img.kookapp.cn", "img.kaiheila.cn"})
+
+# Asset URLs remembered per instance by source URL, so an attachment fanned
+# out to several channels is downloaded and uploaded only once.
+_ASSET_CACHE_SIZE = 512
+
+# Seconds a fetched channel object is reused before asking the API again.
+_CHANNEL_CACHE_TTL = 300
+
+# (text, message type, quoted message id) of a send() held back for batching
+_QueuedSend = tuple[str, khl.MessageTypes, str | None]
+
 
 class KookDriver(BaseDriver[KookConfig]):
     def __init__(self, instance_id: str, config: KookConfig, bridge):
         super().__init__(instance_id, config, bridge)
         self._bot: khl.Bot | None = None
         self._proxy = get_proxy(config.proxy)
+        # source URL -> (asset URL, file name) of attachments already uploaded
+        self._assets: OrderedDict[str, tuple[str, str]] = OrderedDict()
+        # channel_id -> (channel, time.monotonic() when fetched)
+        self._channels: dict[str, tuple[khl.PublicChannel, float]] = {}
+        self._ingress = IngressQueue(f"Kook [{instance_id}]", bridge.on_message)
+        self._batcher: SendBatcher[_QueuedSend] | None = None
+        if config.batch_window_ms > 0:
+            self._batcher = SendBatcher(
+                f"Kook [{instance_id}]",
+                self._flush_batch,
+                config.batch_window_ms / 1000,
+                config.batch_max,
+            )
 
     # ------------------------------------------------------------------
     # Lifecycle
@@ -75,7 +113,13 @@ class KookDriver(BaseDriver[KookConfig]):
         self._bot.client.register(khl.MessageTypes.KMD, on_msg)
 
         logger.info(f"Kook [{self.instance_id}] starting WebSocket connection")
-        await self._bot.start()
+        self._ingress.start()
+        try:
+            await self._bot.start()
+        finally:
+            self._ingress.stop()
+            if self._batcher is not None:
+                self._batcher.stop()
 
     # ------------------------------------------------------------------
     # Receive
@@ -122,7 +166,7 @@ class KookDriver(BaseDriver[KookConfig]):
             source_proxy=self._media_proxy,
             username=username,
         )
-        await self.bridge.on_message(normalized)
+        self._ingress.put(normalized)
 
     # ------------------------------------------------------------------
     # Send
@@ -133,6 +177,7 @@ class KookDriver(BaseDriver[KookConfig]):
         channel: dict,
         text: str,
         attachments: list[Attachment] | None = None,
+        rich_header: dict | None = None,
         **kwargs,
     ):
         reply_to_id = kwargs.get("reply_to_id")
@@ -148,7 +193,6 @@ class KookDriver(BaseDriver[KookConfig]):
             )
             return
 
-        rich_header = kwargs.get("rich_header")
         if rich_header:
             t, c = rich_header.get("title", ""), rich_header.get("content", "")
             # KOOK uses KMarkdown — same bold/italic syntax as Discord Markdown
@@ -170,6 +214,16 @@ class KookDriver(BaseDriver[KookConfig]):
             if not att.url and att.data is None:
                 continue
 
+            known = self._known_asset(att)
+            if known is not None:
+                asset_url, fname = known
+                if att.type == "image":
+                    attachment_fragments.append(f"\n(img){asset_url}(img)")
+                    has_image = True
+                else:
+                    attachment_fragments.append(f"\n[{fname}]({asset_url})")
+                continue
+
             result = await media.fetch_attachment(
                 att, self.config.max_file_size, source_proxy
             )
@@ -189,6 +243,11 @@ class KookDriver(BaseDriver[KookConfig]):
                 attachment_fragments.append(f"\n[{att.type.capitalize()}: {label}]")
                 continue
 
+            if att.url:
+                self._assets[att.url] = (asset_url, fname)
+                if len(self._assets) > _ASSET_CACHE_SIZE:
+                    self._assets.popitem(last=False)
+
             if att.type == "image":
                 # KMarkdown inline image syntax
                 attachment_fragments.append(f"\n(img){asset_url}(img)")
@@ -208,14 +267,65 @@ class KookDriver(BaseDriver[KookConfig]):
             else khl.MessageTypes.TEXT
         )
 
+        if self._batcher is not None:
+            self._batcher.put(channel_id, (full_text, msg_type, reply_to_id))
+            return
+        await self._post(channel_id, full_text, msg_type, reply_to_id)
+
+    async def _flush_batch(self, channel_id: str, batch: list[_QueuedSend]) -> None:
+        """Post runs of queued messages sharing a type and quote as one."""
+        for (msg_type, reply_to_id), group in groupby(
+            batch, key=lambda m: (m[1], m[2])
+        ):
+            text = "\n---\n".join(t for t, _, _ in group)
+            await self._post(channel_id, text, msg_type, reply_to_id)
+
+    async def _post(
+        self,
+        channel_id: str,
+        full_text: str,
+        msg_type: khl.MessageTypes,
+        reply_to_id: str | None,
+    ) -> None:
+        send_kwargs = {"type": msg_type}
+        if reply_to_id:
+            send_kwargs["quote"] = reply_to_id
         try:
-            ch = await self._bot.client.fetch_public_channel(channel_id)
-            if reply_to_id:
-                await ch.send(full_text, type=msg_type, quote=reply_to_id)
-            else:
-                await ch.send(full_text, type=msg_type)
+            ch = await self._get_channel(channel_id)
         except Exception as e:
+            logger.error(f"Kook [{self.instance_id}] channel lookup failed: {e}")
+            return
+        try:
+            await ch.send(full_text, **send_kwargs)
+        except Exception as e:
+            # Not retried: after a timeout or 5xx the message may already be
+            # posted.  Drop the cached channel in case it went stale, so the
+            # next send fetches it again.
+            self._channels.pop(channel_id, None)
             logger.error(f"Kook [{self.instance_id}] send failed: {e}")
 
+    async def _get_channel(self, channel_id: str) -> khl.PublicChannel:
+        """Return the channel object for *channel_id*, cached for a few minutes."""
+        assert self._bot is not None  # Type narrowing - bot is set in start()
+        now = time.monotonic()
+        cached = self._channels.get(channel_id)
+        if cached is not None and now - cached[1] < _CHANNEL_CACHE_TTL:
+            return cached[0]
+        ch = await self._bot.client.fetch_public_channel(channel_id)
+        self._channels[channel_id] = (ch, now)
+        return ch
+
+    def _known_asset(self, att: Attachment) -> tuple[str, str] | None:
+        """Return (asset URL, file name) for *att* if it needs no upload."""
+        url = att.url
+        if not url:
+            return None
+        if urlsplit(url).hostname in _KOOK_ASSET_HOSTS:
+            return url, att.name or url.rsplit("/", 1)[-1]
+        known = self._assets.get(url)
+        if known is not None:
+            self._assets.move_to_end(url)
+        return known
+
 
 register("kook", KookConfig, KookDriver)
@@ -3,7 +3,8 @@
 # Receive: Client.start() sync loop.  ROOM_MESSAGE events (text and media)
 #          are forwarded to the bridge.  Media is downloaded eagerly via
 #          the authenticated client so downstream drivers do not need
-#          Matrix credentials.
+#          Matrix credentials.  Events are processed on per-room lanes, so
+#          each room's messages keep their order.
 # Send:    send_text() for text; upload_media() + send_file() for media.
 #
 # Config keys (under matrix.<instance_id>):
@@ -14,23 +15,32 @@
 #   max_file_size – Max bytes per attachment (default 50 MB)
 #   enable_e2e    – Enable end-to-end encryption support (default: False)
 #   store_path    – Path to store encryption keys (required if enable_e2e is True)
+#   ignore_senders – Matrix user IDs whose messages are never bridged, e.g.
+#                    puppets of another bridge (default: none)
 #
 # Rule channel keys:
 #   room_id – Matrix room ID, e.g. "!abc123:matrix.org"
 
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import cast
 
 import fresholm.import_hook  # noqa: F401
+import orjson
 from aiohttp import ClientSession, TCPConnector
 from aiohttp_socks import ProxyConnector
-from mautrix.api import HTTPAPI
+from mautrix.api import HTTPAPI, Method
 from mautrix.client import Client
 from mautrix.client.syncer import EventHandler
 from mautrix.crypto import OlmMachine
 from mautrix.types import (
     AudioInfo,
     ContentURI,
+    Event,
     EventType,
     FileInfo,
     ImageInfo,
@@ -41,11 +51,12 @@ from mautrix.types import (
     MessageType,
     RelatesTo,
     RoomID,
+    StateEvent,
     TextMessageEventContent,
     UserID,
     VideoInfo,
 )
-from pydantic import model_validator
+from pydantic import Field, model_validator
 
 import services.logger as log
 from drivers import BaseDriver
@@ -66,6 +77,7 @@ class MatrixConfig(_DriverConfig):
     enable_e2e: bool = False
     store_path: str = "data/e2e"
     connect_timeout: int = 30
+    ignore_senders: list[str] = Field(default_factory=list)
 
     @model_validator(mode="after")
     def _require_auth(self) -> "MatrixConfig":
@@ -82,6 +94,31 @@ class MatrixConfig(_DriverConfig):
 
 logger = log.get_logger()
 
+# Sender profiles are reused for this long, or until a membership event
+# reports a change; the cache forgets its oldest entries beyond the cap.
+_PROFILE_TTL = 300
+# Failed lookups (deleted users, federation errors) are retried sooner.
+_PROFILE_MISS_TTL = 60
+_PROFILE_CACHE_SIZE = 4096
+
+# Room events are processed (decrypted, downloaded, profiled) and handed to
+# the bridge by this many workers, each owning a bounded queue.  A room always maps to the same lane,
+# so its messages stay in order; when a lane is full, the sync loop waits
+# instead of events being dropped.
+_ROOM_LANES = 4
+_LANE_QUEUE_SIZE = 32
+
+# Uploaded content URIs remembered per instance by content digest, so an
+# attachment fanned out to several rooms is uploaded only once.
+_UPLOAD_CACHE_SIZE = 128
+
+_CONNECTOR_OPTS = {
+    "limit": 64,
+    "limit_per_host": 32,
+    "ttl_dns_cache": 300,
+    "keepalive_timeout": 75,
+}
+
 _FILE_TYPES = {
     "image": MessageType.IMAGE,
     "video": MessageType.VIDEO,
@@ -90,16 +127,53 @@ _FILE_TYPES = {
 }
 
 
+_INFO_TYPES: dict[str, type[FileInfo | ImageInfo | VideoInfo | AudioInfo]] = {
+    "image": ImageInfo,
+    "video": VideoInfo,
+    "voice": AudioInfo,
+}
+
+
 def _make_info(
     att_type: str, mime: str, size: int
 ) -> FileInfo | ImageInfo | VideoInfo | AudioInfo:
-    if att_type == "image":
-        return ImageInfo(mimetype=mime, size=size)
-    if att_type == "video":
-        return VideoInfo(mimetype=mime, size=size)
-    if att_type == "voice":
-        return AudioInfo(mimetype=mime, size=size)
-    return FileInfo(mimetype=mime, size=size)
+    return _INFO_TYPES.get(att_type, FileInfo)(mimetype=mime, size=size)
+
+
+@lru_cache(maxsize=1024)
+def _fallback_label(att_type: str, label: str) -> str:
+    """Text sent in place of an attachment that could not be bridged."""
+    return f"[{att_type.capitalize()}: {label}]"
+
+
+class _HTTPAPI(HTTPAPI):
+    """HTTPAPI that encodes JSON request bodies with orjson.
+
+    mautrix runs dict/list content through stdlib json.dumps; handing it an
+    already-encoded string makes it send the body as-is.
+    """
+
+    async def request(
+        self,
+        method: Method,
+        path,
+        content=None,
+        headers: dict[str, str] | None = None,
+        **kwargs,
+    ):
+        if method != Method.GET and isinstance(content, (dict, list)):
+            headers = headers or {}
+            if headers.setdefault("Content-Type", "application/json") == (
+                "application/json"
+            ):
+                content = orjson.dumps(content).decode()
+        return await super().request(method, path, content, headers, **kwargs)
+
+
+@lru_cache(maxsize=256)
+def _rich_header_prefix(title: str, content: str) -> str:
+    """Markdown line prepended for a rich header; rules repeat the same few."""
+    return f"**{title}**" + (f" · *{content}*" if content else "")
 
 
 class MatrixDriver(BaseDriver[MatrixConfig]):
@@ -108,6 +182,18 @@ class MatrixDriver(BaseDriver[MatrixConfig]):
         self._client: Client | None = None
         self._crypto: OlmMachine | None = None
         self._proxy = get_proxy(config.proxy)
+        self._ignored = frozenset(config.ignore_senders)
+        self._mxc_prefix = f"{config.homeserver.rstrip('/')}/_matrix/media/v3/download/"
+        # user_id -> (display_name, avatar_http_url, time.monotonic() expiry)
+        self._profiles: dict[str, tuple[str, str, float]] = {}
+        # One in-flight lookup per user; concurrent misses wait on it.
+        self._profile_locks: dict[str, asyncio.Lock] = {}
+        self._lanes: list[asyncio.Queue[Event]] = [
+            asyncio.Queue(_LANE_QUEUE_SIZE) for _ in range(_ROOM_LANES)
+        ]
+        self._lane_workers: list[asyncio.Task] = []
+        # blake2b(data) -> mxc:// URI of media already in the repository
+        self._uploads: OrderedDict[bytes, ContentURI] = OrderedDict()
 
     # ------------------------------------------------------------------
     # Lifecycle
@@ -117,17 +203,21 @@ class MatrixDriver(BaseDriver[MatrixConfig]):
         homeserver = self.config.homeserver.rstrip("/")
         user_id = self.config.user_id
 
-        # proxy support
-        session: ClientSession | None = None
+        # One pooled session carries sync, API calls and media transfers, so
+        # downloads reuse warm keep-alive connections to the homeserver.  It is
+        # not media.get_session(): that one's 30 s read timeout would race the
+        # 30 s /sync long-poll.
         if self._proxy:
             logger.debug(f"Matrix [{self.instance_id}] using proxy {self._proxy}")
-            connector = ProxyConnector.from_url(self._proxy, rdns=True)
+            connector = ProxyConnector.from_url(
+                self._proxy, rdns=True, **_CONNECTOR_OPTS
+            )
         else:
-            connector = None
+            connector = TCPConnector(**_CONNECTOR_OPTS)
 
-        session = ClientSession(connector=connector or TCPConnector(ssl=True))
+        session = ClientSession(connector=connector)
 
-        api = HTTPAPI(
+        api = _HTTPAPI(
             base_url=homeserver,
             token="",  # to be set after login
             client_session=session,
@@ -238,14 +328,21 @@ class MatrixDriver(BaseDriver[MatrixConfig]):
         self._client.ignore_first_sync = True
         self._client.ignore_initial_sync = True
 
+        # wait_sync: the next /sync waits until these handlers have queued
+        # their events, which is what pushes back when a lane is full.
+        self._client.add_event_handler(
+            EventType.ROOM_MESSAGE, cast(EventHandler, self._enqueue), wait_sync=True
+        )
         self._client.add_event_handler(
-            EventType.ROOM_MESSAGE, cast(EventHandler, self._on_message)
+            EventType.ROOM_MEMBER, cast(EventHandler, self._on_member)
         )
 
         # Add event handler for encrypted events
         if self._crypto:
             self._client.add_event_handler(
-                EventType.ROOM_ENCRYPTED, cast(EventHandler, self._on_encrypted_message)
+                EventType.ROOM_ENCRYPTED,
+                cast(EventHandler, self._enqueue),
+                wait_sync=True,
             )
             # Add event handler for room key events (needed for E2E encryption)
             self._client.add_event_handler(
@@ -257,48 +354,114 @@ class MatrixDriver(BaseDriver[MatrixConfig]):
         # called while self._client is None (e.g. after a config error above).
         self.bridge.register_sender(self.instance_id, self.send)
         logger.info(f"Matrix [{self.instance_id}] starting sync")
+        self._lane_workers = [
+            asyncio.create_task(
+                self._lane_worker(lane), name=f"Matrix [{self.instance_id}] lane/{i}"
+            )
+            for i, lane in enumerate(self._lanes)
+        ]
         try:
             await self._client.start(filter_data=None)
         except Exception as e:
             logger.error(f"Matrix [{self.instance_id}] sync loop error: {e}")
             raise
+        finally:
+            for task in self._lane_workers:
+                task.cancel()
+            self._lane_workers = []
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
     def _mxc_to_http(self, mxc_uri: str) -> str:
-        if not mxc_uri or not mxc_uri.startswith("mxc://"):
+        if not mxc_uri.startswith("mxc://"):
             return ""
-        return f"{self.config.homeserver.rstrip('/')}/_matrix/media/v3/download/{mxc_uri[6:]}"
+        return self._mxc_prefix + mxc_uri[6:]
 
     def _mxid_local(self, user_id: str) -> str:
-        return user_id.split(":")[0].lstrip("@") if ":" in user_id else user_id
+        # "@alice:example.org" -> "alice", sliced without splitting
+        colon = user_id.find(":")
+        if colon < 0:
+            return user_id
+        return user_id[1:colon] if user_id.startswith("@") else user_id[:colon]
 
     async def _get_profile(self, user_id: str) -> tuple[str, str]:
-        """Return (display_name, avatar_http_url) for a Matrix user ID."""
-        display_name = self._mxid_local(user_id)
-        avatar_url = ""
+        """Return (display_name, avatar_http_url) for a Matrix user ID, cached."""
+        cached = self._profiles.get(user_id)
+        if cached is not None and time.monotonic() < cached[2]:
+            return cached[0], cached[1]
+
+        lock = self._profile_locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            cached = self._profiles.get(user_id)
+            if cached is not None and time.monotonic() < cached[2]:
+                return cached[0], cached[1]
+            profile = await self._fetch_profile(user_id)
+            if profile is not None:
+                display_name, avatar_url = profile
+                ttl = _PROFILE_TTL
+            else:
+                display_name, avatar_url = self._mxid_local(user_id), ""
+                ttl = _PROFILE_MISS_TTL
+            self._profiles.pop(user_id, None)
+            self._profiles[user_id] = (
+                display_name,
+                avatar_url,
+                time.monotonic() + ttl,
+            )
+            if len(self._profiles) > _PROFILE_CACHE_SIZE:
+                del self._profiles[next(iter(self._profiles))]
+        self._profile_locks.pop(user_id, None)
+        return display_name, avatar_url
+
+    async def _fetch_profile(self, user_id: str) -> tuple[str, str] | None:
+        """Return (display_name, avatar_http_url), or None if the lookup failed."""
         if self._client is None:
-            return display_name, avatar_url
+            return None
         try:
-            name = await self._client.get_displayname(UserID(user_id))
-            if name:
-                display_name = name
+            # One /profile request carries both the name and the avatar.
+            profile = await self._client.get_profile(UserID(user_id))
         except Exception:
-            pass
-        try:
-            mxc = await self._client.get_avatar_url(UserID(user_id))
-            if mxc:
-                avatar_url = self._mxc_to_http(str(mxc))
-        except Exception:
-            pass
+            return None
+        display_name = self._mxid_local(user_id)
+        avatar_url = ""
+        if profile.displayname:
+            display_name = profile.displayname
+        if profile.avatar_url:
+            avatar_url = self._mxc_to_http(str(profile.avatar_url))
         return display_name, avatar_url
 
     # ------------------------------------------------------------------
     # Receive
     # ------------------------------------------------------------------
 
+    async def _on_member(self, event: StateEvent) -> None:
+        # A join/profile change may carry a new name or avatar.
+        if event.state_key:
+            self._profiles.pop(event.state_key, None)
+
+    async def _enqueue(self, event: Event) -> None:
+        """Sync handler: queue a message or encrypted event on its room's lane."""
+        if self._client and event.sender == self._client.mxid:
+            return
+        if event.sender in self._ignored:
+            return
+        await self._lanes[hash(event.room_id) % _ROOM_LANES].put(event)
+
+    async def _lane_worker(self, lane: asyncio.Queue[Event]) -> None:
+        while True:
+            event = await lane.get()
+            try:
+                if event.type == EventType.ROOM_ENCRYPTED:
+                    await self._on_encrypted_message(event)
+                else:
+                    await self._on_message(cast(MessageEvent, event))
+            except Exception:
+                logger.exception(f"Matrix [{self.instance_id}] event dispatch failed")
+            finally:
+                lane.task_done()
+
     async def _on_encrypted_message(self, event) -> None:
         """Handle encrypted messages by decrypting them and processing the content."""
         if not self._crypto:
@@ -342,9 +505,6 @@ class MatrixDriver(BaseDriver[MatrixConfig]):
             )
 
     async def _on_message(self, event: MessageEvent) -> None:
-        if self._client and event.sender == self._client.mxid:
-            return
-
         content = event.content
 
         if isinstance(content, TextMessageEventContent):
@@ -354,17 +514,21 @@ class MatrixDriver(BaseDriver[MatrixConfig]):
             if not text.strip():
                 return
 
-            mentions = []
             # MSC3952: intentional mentions
             raw_mentions = content.get("m.mentions", {})
+            user_ids = []
             if isinstance(raw_mentions, dict):
                 user_ids = raw_mentions.get("user_ids", [])
-                for uid in user_ids:
-                    # Try to get display name
-                    name, _ = await self._get_profile(uid)
-                    mentions.append({"id": uid, "name": name})
 
-            display_name, avatar = await self._get_profile(str(event.sender))
+            # Sender and mentioned users are looked up together.
+            (display_name, avatar), *mentioned = await asyncio.gather(
+                self._get_profile(str(event.sender)),
+                *(self._get_profile(uid) for uid in user_ids),
+            )
+            mentions = [
+                {"id": uid, "name": name}
+                for uid, (name, _) in zip(user_ids, mentioned, strict=True)
+            ]
             await self.bridge.on_message(
                 NormalizedMessage(
                     platform="matrix",
@@ -398,26 +562,14 @@ class MatrixDriver(BaseDriver[MatrixConfig]):
                 )
                 return
 
-            att_data: bytes | None = None
-            att_url = ""
-            mxc = content.url
-            if mxc and self._client:
-                try:
-                    raw = await self._client.download_media(mxc)
-                    if len(raw) <= self.config.max_file_size:
-                        att_data = raw
-                    else:
-                        logger.debug(
-                            f"Matrix [{self.instance_id}] {content.body!r} exceeds size limit"
-                        )
-                        return
-                except Exception as e:
-                    logger.warning(
-                        f"Matrix [{self.instance_id}] media download failed: {e}"
-                    )
-                    att_url = self._mxc_to_http(str(mxc))
-
-            display_name, avatar = await self._get_profile(str(event.sender))
+            # Download and profile lookup overlap instead of running back to back.
+            downloaded, (display_name, avatar) = await asyncio.gather(
+                self._download(content),
+                self._get_profile(str(event.sender)),
+            )
+            if downloaded is None:
+                return
+            att_data, att_url = downloaded
             fname = getattr(content, "filename", None) or content.body or ""
             await self.bridge.on_message(
                 NormalizedMessage(
@@ -437,6 +589,29 @@ class MatrixDriver(BaseDriver[MatrixConfig]):
                 )
             )
 
+    async def _download(
+        self, content: MediaMessageEventContent
+    ) -> tuple[bytes | None, str] | None:
+        """Return (data, fallback_url) for an incoming media event.
+
+        *data* is None when the download failed and *fallback_url* should be
+        used instead; None overall means the file exceeds max_file_size.
+        """
+        mxc = content.url
+        if not mxc or not self._client:
+            return None, ""
+        try:
+            raw = await self._client.download_media(mxc)
+        except Exception as e:
+            logger.warning(f"Matrix [{self.instance_id}] media download failed: {e}")
+            return None, self._mxc_to_http(str(mxc))
+        if len(raw) > self.config.max_file_size:
+            logger.debug(
+                f"Matrix [{self.instance_id}] {content.body!r} exceeds size limit"
+            )
+            return None
+        return raw, ""
+
     # ------------------------------------------------------------------
     # Send
     # ------------------------------------------------------------------
@@ -468,9 +643,9 @@ class MatrixDriver(BaseDriver[MatrixConfig]):
 
         rich_header = kwargs.get("rich_header")
         if rich_header:
-            t = rich_header.get("title", "")
-            c = rich_header.get("content", "")
-            prefix = f"**{t}**" + (f" · *{c}*" if c else "")
+            prefix = _rich_header_prefix(
+                rich_header.get("title", ""), rich_header.get("content", "")
+            )
             text = f"{prefix}\n{text}" if text else prefix
 
         mentions = kwargs.get("mentions", [])
@@ -494,6 +669,12 @@ class MatrixDriver(BaseDriver[MatrixConfig]):
                 )
             is_html = True
 
+        # Attachments are fetched and uploaded concurrently, starting before the
+        # text goes out; the resulting events are then posted in order.
+        source_proxy = self._source_proxy_from_kwargs(kwargs)
+        pending = [att for att in attachments or [] if att.url or att.data is not None]
+        uploads = asyncio.gather(*(self._upload(att, source_proxy) for att in pending))
+
         relates_obj: RelatesTo | None = None
         if text.strip():
             relates_obj = (
@@ -513,44 +694,19 @@ class MatrixDriver(BaseDriver[MatrixConfig]):
             except Exception as e:
                 logger.error(f"Matrix [{self.instance_id}] send text failed: {e}")
 
-        source_proxy = self._source_proxy_from_kwargs(kwargs)
-        for att in attachments or []:
-            if not att.url and att.data is None:
-                continue
-
-            result = await media.fetch_attachment(
-                att, self.config.max_file_size, source_proxy
-            )
-            if not result:
-                label = att.name or att.url or ""
+        for att, uploaded in zip(pending, await uploads, strict=True):
+            if isinstance(uploaded, str):
                 await self._send_fallback(
-                    room_id, f"[{att.type.capitalize()}: {label}]", relates_obj
-                )
-                continue
-
-            data_bytes, mime = result
-            fname = media.filename_for(att.name, mime)
-
-            try:
-                mxc_uri: ContentURI = await self._client.upload_media(
-                    data=data_bytes,
-                    mime_type=mime,
-                    filename=fname,
-                    size=len(data_bytes),
-                )
-            except Exception as e:
-                logger.error(f"Matrix [{self.instance_id}] upload failed: {e}")
-                label = att.name or att.url or fname
-                await self._send_fallback(
-                    room_id, f"[{att.type.capitalize()}: {label}]", relates_obj
+                    room_id, _fallback_label(att.type, uploaded), relates_obj
                 )
                 continue
 
+            mxc_uri, mime, fname, size = uploaded
             try:
                 await self._client.send_file(
                     room_id,
                     url=mxc_uri,
-                    info=_make_info(att.type, mime, len(data_bytes)),
+                    info=_make_info(att.type, mime, size),
                     file_name=fname,
                     file_type=_FILE_TYPES.get(att.type, MessageType.FILE),
                     relates_to=relates_obj,
@@ -558,6 +714,44 @@ class MatrixDriver(BaseDriver[MatrixConfig]):
             except Exception as e:
                 logger.error(f"Matrix [{self.instance_id}] send media failed: {e}")
 
+    async def _upload(
+        self, att: Attachment, source_proxy: str | None
+    ) -> tuple[ContentURI, str, str, int] | str:
+        """Fetch *att* and upload it to the media repository.
+
+        Returns (mxc_uri, mime, file_name, size), or the label to show in a
+        text fallback when the attachment could not be fetched or uploaded.
+        """
+        assert self._client is not None  # Type narrowing - checked in send()
+        result = await media.fetch_attachment(
+            att, self.config.max_file_size, source_proxy
+        )
+        if not result:
+            return att.name or att.url or ""
+
+        data_bytes, mime = result
+        fname = media.filename_for(att.name, mime)
+        digest = hashlib.blake2b(data_bytes, digest_size=16).digest()
+        mxc_uri = self._uploads.get(digest)
+        if mxc_uri is not None:
+            self._uploads.move_to_end(digest)
+            return mxc_uri, mime, fname, len(data_bytes)
+
+        try:
+            mxc_uri = await self._client.upload_media(
+                data=data_bytes,
+                mime_type=mime,
+                filename=fname,
+                size=len(data_bytes),
+            )
+        except Exception as e:
+            logger.error(f"Matrix [{self.instance_id}] upload failed: {e}")
+            return att.name or att.url or fname
+        self._uploads[digest] = mxc_uri
+        if len(self._uploads) > _UPLOAD_CACHE_SIZE:
+            self._uploads.popitem(last=False)
+        return mxc_uri, mime, fname, len(data_bytes)
+
     async def _send_fallback(
         self, room_id: str, body: str, relates_obj: RelatesTo | None = None
     ) -> None:
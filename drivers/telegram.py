@@ -213,6 +213,7 @@ class TelegramDriver(BaseDriver[TelegramConfig]):
     def __init__(self, instance_id: str, config: TelegramConfig, bridge):
         super().__init__(instance_id, config, bridge)
         self._app: Application | None = None
+        self._stopped = asyncio.Event()
         self._proxy = get_proxy(config.proxy)
 
     async def start(self):
@@ -242,7 +243,7 @@ class TelegramDriver(BaseDriver[TelegramConfig]):
         # ensure bot's get_me is retried on failure
         # error in start/start_polling shouldn't happen, so let it crash if it does
         try:
-            while True:
+            while self._app is not None:
                 try:
                     await self._app.initialize()
                     break
@@ -254,6 +255,8 @@ class TelegramDriver(BaseDriver[TelegramConfig]):
         except asyncio.CancelledError:
             logger.info(f"Telegram [{self.instance_id}] initialization cancelled.")
             return
+        if self._app is None:  # stop() was called during initialization
+            return
         await self._app.start()
         assert self._app.updater is not None
         logger.info(f"Telegram [{self.instance_id}] application started.")
@@ -264,22 +267,24 @@ class TelegramDriver(BaseDriver[TelegramConfig]):
         )
         logger.info(f"Telegram [{self.instance_id}] polling started.")
         try:
-            await asyncio.Event().wait()
+            await self._stopped.wait()
         except asyncio.CancelledError:
             logger.info(f"Telegram [{self.instance_id}] polling cancelled.")
         finally:
             await self.stop()
 
     async def stop(self):
-        if not self._app:
+        self._stopped.set()
+        # Detach first so the call from start()'s finally does not tear down twice.
+        app, self._app = self._app, None
+        if not app:
             return
-        if self._app.updater and self._app.updater.running:
-            await self._app.updater.stop()
-        if self._app.running:
-            await self._app.stop()
-        if not self._app.running:
-            await self._app.shutdown()
-        self._app = None
+        if app.updater and app.updater.running:
+            await app.updater.stop()
+        if app.running:
+            await app.stop()
+        if not app.running:
+            await app.shutdown()
 
     async def _on_error(self, _: object, context: ContextTypes.DEFAULT_TYPE) -> None:
         logger.opt(exception=True).exception(
@@ -8,6 +8,11 @@ from tomllib import load as load_toml
 
 from pydantic import ValidationError
 
+try:
+    import uvloop
+except ImportError:  # not available on Windows
+    uvloop = None
+
 import services.error  # noqa: F401
 import services.logger as log
 import services.util as u
@@ -19,6 +24,9 @@ from services.http_server import HttpServerManager
 
 logger = log.get_logger()
 
+# Seconds drivers get to return from start() after stop() before being cancelled.
+_STOP_GRACE = 5.0
+
 
 def _load_project_version() -> str:
     """Load project version from pyproject.toml.
@@ -104,6 +112,7 @@ async def main():
 
     enabled_platforms = [key for key in raw if key != "global"]
     _load_all_drivers(enabled_platforms)
+    from drivers import BaseDriver
     from drivers.registry import all_drivers
 
     logger.info("NextBridge starting...")
@@ -147,6 +156,7 @@ async def main():
         port=validated_global.http.port,
         root_path=validated_global.http.root_path,
         log_level=validated_global.http.log_level,
+        reuse_port=validated_global.http.reuse_port,
         start_without_mounts=validated_global.http.enable == "true",
         version=version,
     )
@@ -181,6 +191,8 @@ async def main():
     logger.info(f"========== NextBridge v{version} Starting ==========")
 
     driver_tasks: list[asyncio.Task] = []
+    # Drivers with their own stop() hook, paired with the task running start().
+    stoppable: list[tuple[BaseDriver, asyncio.Task]] = []
     for platform, (_, driver_cls) in registry.items():
         for inst_id, cfg in validated.get(platform, {}).items():
             drv = driver_cls(inst_id, cfg, bridge)
@@ -188,6 +200,8 @@ async def main():
             task = asyncio.create_task(drv.start(), name=f"{platform}/{inst_id}")
             task.add_done_callback(_on_task_done)
             driver_tasks.append(task)
+            if type(drv).stop is not BaseDriver.stop:
+                stoppable.append((drv, task))
             logger.info(f"Registered driver: {platform}/{inst_id}")
 
     if not driver_tasks and validated_global.http.enable != "true":
@@ -218,13 +232,29 @@ async def main():
         logger.info("No HTTP sub-app mounted; shared HTTP server disabled")
 
     try:
-        results = await asyncio.gather(*all_tasks, return_exceptions=True)
-        for task, result in zip(all_tasks, results):
+        # asyncio.wait, unlike gather, leaves the tasks running when we are
+        # cancelled, so drivers get a chance to stop() before being cancelled.
+        await asyncio.wait(all_tasks)
+        for task in all_tasks:
+            result = None if task.cancelled() else task.exception()
             if isinstance(result, Exception):
                 logger.error(f"Driver '{task.get_name()}' exited with error: {result}")
     except asyncio.CancelledError:
         logger.info("NextBridge shutting down...")
 
+        # ask drivers to return on their own before falling back to cancellation
+        if stoppable:
+            results = await asyncio.gather(
+                *(asyncio.wait_for(drv.stop(), _STOP_GRACE) for drv, _ in stoppable),
+                return_exceptions=True,
+            )
+            for (_, task), result in zip(stoppable, results):
+                if isinstance(result, BaseException):
+                    logger.warning(
+                        f"Driver '{task.get_name()}' failed to stop: {result!r}"
+                    )
+            await asyncio.wait([task for _, task in stoppable], timeout=_STOP_GRACE)
+
         # stop all tasks explicitly
         for task in all_tasks:
             if not task.done():
@@ -260,6 +290,6 @@ if __name__ == "__main__":
         sys.exit(0)
 
     try:
-        asyncio.run(main())
+        asyncio.run(main(), loop_factory=uvloop.new_event_loop if uvloop else None)
     except KeyboardInterrupt:
         pass
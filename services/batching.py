@@ -0,0 +1,129 @@
+# Per-channel coalescing of outgoing messages for drivers that opt into it.
+#
+# send() hands each message to put() under a channel key instead of posting
+# it.  One flusher task per key waits for the first item, keeps collecting
+# for up to ``window`` seconds (or until ``max_items`` are queued), then
+# passes the whole batch to the driver's flush callback, which can merge the
+# texts into a single API call.  Each key is drained in FIFO order; drain()
+# sends what is queued for a key right away, so a post that bypasses the
+# batcher can wait for the messages queued before it.  Items that never
+# reach the flush callback because the batcher stopped are handed to the
+# optional ``on_drop`` callback, so callers waiting on them can be released.
+#
+# Usage:
+#   self._batcher = SendBatcher(f"KOOK [{instance_id}]", self._flush, 0.04, 10)
+#   self._batcher.put(channel_id, item)   # from send()
+#   await self._batcher.drain(channel_id) # before an unbatched send
+#   self._batcher.stop()                  # on shutdown
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import services.logger as log
+
+logger = log.get_logger()
+
+
+class _Drain:
+    """Queue marker: flush everything before it, then resolve ``done``."""
+
+    __slots__ = ("done",)
+
+    def __init__(self):
+        self.done: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+
+    def resolve(self) -> None:
+        if not self.done.done():
+            self.done.set_result(None)
+
+
+class SendBatcher[T]:
+    def __init__(
+        self,
+        label: str,
+        flush: Callable[[str, list[T]], Awaitable[None]],
+        window: float,
+        max_items: int,
+        on_drop: Callable[[str, list[T]], None] | None = None,
+    ):
+        self._label = label
+        self._flush = flush
+        self._window = window
+        self._max_items = max(1, max_items)
+        self._on_drop = on_drop
+        self._queues: dict[str, asyncio.Queue[T | _Drain]] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def put(self, key: str, item: T) -> None:
+        """Queue *item* for *key*, starting that key's flusher on first use."""
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.Queue()
+            self._tasks[key] = asyncio.create_task(
+                self._run(key, queue), name=f"{self._label} batch/{key}"
+            )
+        queue.put_nowait(item)
+
+    async def drain(self, key: str) -> None:
+        """Send everything queued for *key* now and wait until it is out."""
+        queue = self._queues.get(key)
+        if queue is None:
+            return
+        marker = _Drain()
+        queue.put_nowait(marker)
+        await marker.done
+
+    def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        # Release anyone still waiting in drain() or on a queued item.
+        for key, queue in self._queues.items():
+            dropped: list[T] = []
+            while not queue.empty():
+                item = queue.get_nowait()
+                if isinstance(item, _Drain):
+                    item.resolve()
+                else:
+                    dropped.append(item)
+            self._drop(key, dropped)
+        self._tasks.clear()
+        self._queues.clear()
+
+    def _drop(self, key: str, items: list[T]) -> None:
+        if items and self._on_drop is not None:
+            self._on_drop(key, items)
+
+    async def _run(self, key: str, queue: asyncio.Queue[T | _Drain]) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue.get()
+            if isinstance(item, _Drain):
+                item.resolve()
+                continue
+            batch = [item]
+            drain: _Drain | None = None
+            deadline = loop.time() + self._window
+            try:
+                while len(batch) < self._max_items:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except TimeoutError:
+                        break
+                    if isinstance(item, _Drain):
+                        drain = item
+                        break
+                    batch.append(item)
+            except asyncio.CancelledError:
+                # Stopped while collecting: the batch never reaches flush.
+                self._drop(key, batch)
+                raise
+            try:
+                await self._flush(key, batch)
+            except Exception:
+                logger.exception(f"{self._label} batched send to {key} failed")
+            finally:
+                if drain is not None:
+                    drain.resolve()
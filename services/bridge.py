@@ -3,6 +3,7 @@ import hashlib
 import json
 import re
 from collections.abc import Callable
+from functools import lru_cache
 from typing import Any
 
 import services.logger as log
@@ -43,6 +44,20 @@ def _parse_richheader(text: str) -> tuple[str, dict | None]:
     return clean, attrs or None
 
 
+@lru_cache(maxsize=256)
+def _compile_msg_format(fmt: str) -> tuple[str, tuple[tuple[str, str], ...] | None]:
+    """
+    Split a ``msg_format`` template into its body and rich-header templates.
+
+    Rules reuse the same few templates for every message, so the tag is
+    parsed once per template here instead of once per formatted message.
+    Returns ``(body_fmt, attr_fmts)``; *attr_fmts* is ``None`` when the
+    template has no ``<richheader/>`` tag.
+    """
+    body, attrs = _parse_richheader(fmt)
+    return body, tuple(attrs.items()) if attrs else None
+
+
 def _collect_sensitive(obj, found: set[str]) -> None:
     """Recursively extract sensitive string values from the config dict."""
     if isinstance(obj, dict):
@@ -71,6 +86,10 @@ class Bridge:
 
     def __init__(self):
         self._rules: list[dict] = []
+        # instance_id → channel address blocks that some rule routes from
+        self._routes: dict[str, list[dict]] = {}
+        # connect rule id → (target_id, channel, merged msg config, is_webhook)
+        self._connect_targets: dict[str, list[tuple[str, dict, dict, bool]]] = {}
         self._senders: dict[str, tuple[str | None, Callable]] = {}
         self._sensitive: frozenset[str] = frozenset()
         self.strict_echo_match: bool = False
@@ -86,11 +105,65 @@ class Bridge:
         if rules_path is None:
             logger.warning("No rules file found")
             self._rules = []
+            self._routes = {}
+            self._connect_targets = {}
             return
 
         self._rules = rules
+        self._routes = self._build_routes(rules)
+        self._connect_targets = {
+            str(rule["id"]): self._build_connect_targets(rule)
+            for rule in rules
+            if rule.get("type") == "connect"
+        }
         logger.info(f"Loaded {len(self._rules)} bridge rule(s) from {rules_path.name}")
 
+    @staticmethod
+    def _build_routes(rules: list[dict]) -> dict[str, list[dict]]:
+        """Index the source channel blocks of every rule by instance id."""
+        routes: dict[str, list[dict]] = {}
+        for rule in rules:
+            if rule.get("type") == "connect":
+                sources = rule.get("channels", {})
+            else:
+                sources = rule.get("from", {})
+            for instance_id, channel_cfg in sources.items():
+                routes.setdefault(instance_id, []).append(channel_cfg)
+        return routes
+
+    @staticmethod
+    def _build_connect_targets(rule: dict) -> list[tuple[str, dict, dict, bool]]:
+        """Resolve each connect channel's address and effective msg config."""
+        global_msg_cfg = rule.get("msg", {})
+        targets = []
+        for target_id, target_cfg in rule.get("channels", {}).items():
+            # Strip the reserved "msg" key to get the bare channel address dict
+            target_channel = {k: v for k, v in target_cfg.items() if k != "msg"}
+            # Per-target msg overrides the global msg (target wins on conflict)
+            merged_msg_cfg = {**global_msg_cfg, **target_cfg.get("msg", {})}
+            # Ensure webhook_url is passed to extra if present in target_cfg
+            is_webhook = "webhook_url" in target_cfg
+            if is_webhook:
+                merged_msg_cfg["webhook_url"] = target_cfg["webhook_url"]
+            targets.append((target_id, target_channel, merged_msg_cfg, is_webhook))
+        return targets
+
+    def is_routed(self, instance_id: str, channel: dict) -> bool:
+        """Return True if any rule would pick up a message from *channel*.
+
+        Lets drivers skip building a NormalizedMessage for traffic that no
+        rule forwards.  Uses the same matching as ``on_message``.
+        """
+        for rule_ch in self._routes.get(instance_id, ()):
+            for key, expected in rule_ch.items():
+                if key == "msg" or key not in channel:
+                    continue
+                if str(channel[key]) != str(expected):
+                    break
+            else:
+                return True
+        return False
+
     def _build_bridge_id(self, rule_id: str, msg: NormalizedMessage) -> str:
         """Build a deterministic bridge id based on rule id and message fingerprint."""
         if msg.message_id:
@@ -458,13 +531,16 @@ class Bridge:
             "nickname": getattr(msg, "nickname", ""),
             "source_mentioned_self": getattr(msg, "source_mentioned_self", None),
         }
+        body_fmt, header_fmts = _compile_msg_format(fmt)
         try:
-            formatted = fmt.format(**ctx)
+            if header_fmts is None:
+                formatted, rich_header = _parse_richheader(fmt.format(**ctx))
+            else:
+                formatted = body_fmt.format(**ctx).strip()
+                rich_header = {k: v.format(**ctx) for k, v in header_fmts}
         except KeyError as e:
             logger.warning(f"msg_format missing key {e}; using raw text")
-            formatted = msg.text
-
-        formatted, rich_header = _parse_richheader(formatted)
+            formatted, rich_header = _parse_richheader(msg.text)
 
         extra: dict = {}
         # Always pass the original message context to extra for drivers to use
@@ -481,7 +557,8 @@ class Bridge:
                 extra[k] = v
                 continue
             try:
-                extra[k] = v.format(**ctx) if isinstance(v, str) else v
+                # Only strings with a brace can be templates (or hold escapes).
+                extra[k] = v.format(**ctx) if isinstance(v, str) and "{" in v else v
             except KeyError:
                 extra[k] = v
 
@@ -626,12 +703,11 @@ class Bridge:
         reply_bridge_id: str | None = None,
     ):
         """Fan-out to every channel in the connect rule except the source."""
-        global_msg_cfg = rule.get("msg", {})
-
-        for target_id, target_cfg in rule.get("channels", {}).items():
-            # Strip the reserved "msg" key to get the bare channel address dict
-            target_channel = {k: v for k, v in target_cfg.items() if k != "msg"}
+        targets = self._connect_targets.get(str(rule.get("id", "")))
+        if targets is None:
+            targets = self._build_connect_targets(rule)
 
+        for target_id, target_channel, merged_msg_cfg, is_webhook in targets:
             # Skip echo based on strict_echo_match configuration
             if self._should_skip_echo(target_id, target_channel, msg):
                 # logger.debug(f"Skipping echo to {target_id}")
@@ -639,14 +715,6 @@ class Bridge:
 
             logger.debug(f"Dispatching to {target_id} channel={target_channel}")
 
-            # Per-target msg overrides the global msg (target wins on conflict)
-            merged_msg_cfg = {**global_msg_cfg, **target_cfg.get("msg", {})}
-
-            # Ensure webhook_url is passed to extra if present in target_cfg
-            is_webhook = "webhook_url" in target_cfg
-            if is_webhook:
-                merged_msg_cfg["webhook_url"] = target_cfg["webhook_url"]
-
             formatted, extra = self._build_formatted(
                 msg, merged_msg_cfg, is_webhook=is_webhook
             )
@@ -112,6 +112,15 @@ class HttpConfig(BaseModel):
     log_level: Literal["critical", "error", "warning", "info", "debug"] = "info"
     """Uvicorn log level used by the shared HTTP server."""
 
+    reuse_port: CoercedBool = False
+    """Bind the listening socket with ``SO_REUSEPORT``.
+
+    Lets several NextBridge processes share one port, with the kernel
+    spreading incoming connections between them. Leave it off unless that
+    is intended: a second process would otherwise fail to bind instead of
+    silently taking half the traffic.
+    """
+
     enable: Literal["unset", "true", "false"] = "unset"
     """HTTP server startup mode.
 
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import socket
 from dataclasses import dataclass
 from typing import Any
 
@@ -64,6 +65,7 @@ class HttpServerManager:
         port: int = 9080,
         root_path: str = "",
         log_level: str = "info",
+        reuse_port: bool = False,
         start_without_mounts: bool = False,
         version: str = "UNKNOWN",
     ):
@@ -71,6 +73,7 @@ class HttpServerManager:
         self.port = port
         self.root_path = root_path
         self.log_level = log_level.lower()
+        self.reuse_port = reuse_port
         self.start_without_mounts = start_without_mounts
         self.version = version
 
@@ -88,6 +91,16 @@ class HttpServerManager:
             path = path[:-1]
         return path
 
+    def _bind_reuse_port(self) -> socket.socket:
+        """Bind the listening socket with SO_REUSEPORT (uvicorn has no option)."""
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self.host, self.port))
+        sock.set_inheritable(True)
+        return sock
+
     def mount(self, instance_id: str, path: str, app: Any) -> None:
         """Register an ASGI sub-app for a driver.
 
@@ -157,4 +170,9 @@ class HttpServerManager:
         )
         server = uvicorn.Server(cfg)
         self._started = True
-        await server.serve()
+        if self.reuse_port and hasattr(socket, "SO_REUSEPORT"):
+            await server.serve(sockets=[self._bind_reuse_port()])
+        else:
+            if self.reuse_port:
+                logger.warning("http.reuse_port is not supported on this platform")
+            await server.serve()
@@ -0,0 +1,74 @@
+# Bounded hand-off between a driver's receive path and bridge dispatch.
+#
+# Gateway / event callbacks enqueue normalized messages and return at once;
+# a fixed set of worker tasks feeds them to Bridge.on_message.  A slow
+# downstream platform then backs up this queue instead of the receive loop,
+# and a flood is shed (with a warning) once the queue is full.
+#
+# Usage:
+#   self._ingress = IngressQueue(f"Discord [{instance_id}]", bridge.on_message)
+#   self._ingress.start()          # inside the driver's start()
+#   self._ingress.put(msg)         # from the event handler
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import services.logger as log
+from services.message import NormalizedMessage
+
+logger = log.get_logger()
+
+
+class IngressQueue:
+    def __init__(
+        self,
+        label: str,
+        handler: Callable[[NormalizedMessage], Awaitable[None]],
+        maxsize: int = 1000,
+        workers: int = 4,
+    ):
+        self._label = label
+        self._handler = handler
+        self._queue: asyncio.Queue[NormalizedMessage] = asyncio.Queue(maxsize)
+        self._workers = workers
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Spawn the dispatch workers on the running loop (idempotent)."""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"{self._label} ingress/{i}")
+            for i in range(self._workers)
+        ]
+
+    def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def put(self, msg: NormalizedMessage) -> bool:
+        """Queue *msg* for dispatch; drops it and returns False if the queue
+        is full, so webhook drivers can ask the sender to retry.
+
+        Must be called on the loop thread — use ``loop.call_soon_threadsafe``
+        from foreign threads.
+        """
+        try:
+            self._queue.put_nowait(msg)
+        except asyncio.QueueFull:
+            logger.warning(
+                f"{self._label} ingress queue full, dropping message {msg.message_id}"
+            )
+            return False
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            msg = await self._queue.get()
+            try:
+                await self._handler(msg)
+            except Exception:
+                logger.exception(f"{self._label} dispatch failed")
+            finally:
+                self._queue.task_done()
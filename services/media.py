@@ -9,9 +9,11 @@
 
 import mimetypes
 import asyncio
+import io
 import shutil
 
 import aiohttp
+import orjson
 from aiohttp_socks import ProxyConnector
 
 import services.logger as log
@@ -81,7 +83,12 @@ async def _convert_amr_to_ogg(data: bytes) -> tuple[bytes, str] | None:
         return None
 
 
-def _get_session(proxy: str | None = None) -> aiohttp.ClientSession:
+def get_session(proxy: str | None = None) -> aiohttp.ClientSession:
+    """Return the process-wide HTTP session for *proxy*, creating it on demand.
+
+    Media downloads and driver API calls share these sessions so repeated
+    requests to the same host reuse warm keep-alive connections.
+    """
     global _sessions
 
     if proxy in _sessions and not _sessions[proxy].closed:
@@ -89,8 +96,23 @@ def _get_session(proxy: str | None = None) -> aiohttp.ClientSession:
         return _sessions[proxy]
 
     # new session
-    connector = ProxyConnector.from_url(proxy, rdns=True) if proxy else None
-    session = aiohttp.ClientSession(connector=connector)
+    connector_opts = {
+        "limit": 100,
+        "limit_per_host": 20,
+        "ttl_dns_cache": 300,
+        "keepalive_timeout": 75,
+    }
+    connector = (
+        ProxyConnector.from_url(proxy, rdns=True, **connector_opts)
+        if proxy
+        else aiohttp.TCPConnector(**connector_opts)
+    )
+    session = aiohttp.ClientSession(
+        connector=connector,
+        # No overall deadline: large uploads may legitimately take a while.
+        timeout=aiohttp.ClientTimeout(total=None, sock_connect=5, sock_read=30),
+        json_serialize=lambda obj: orjson.dumps(obj).decode(),
+    )
     _sessions[proxy] = session
     logger.debug(
         f"New {'proxy' if proxy else 'direct'} session {session}{f'({session._default_proxy})' if proxy else ''}"
@@ -137,7 +159,7 @@ async def fetch(
     if not url:
         return None
 
-    session = _get_session(proxy=proxy)
+    session = get_session(proxy)
 
     try:
         # Pre-flight HEAD to skip obviously oversized files without downloading
@@ -158,23 +180,103 @@ async def fetch(
 
         async with session.get(url, timeout=aiohttp.ClientTimeout(total=60)) as resp:
             resp.raise_for_status()
-            chunks: list[bytes] = []
-            total = 0
+            # BytesIO grows one buffer in place and getvalue() hands it over
+            # without copying, so peak memory stays ~1x the file size rather
+            # than 2x for a list of chunks joined at the end.
+            buf = io.BytesIO()
             async for chunk in resp.content.iter_chunked(65536):
-                total += len(chunk)
-                if total > max_bytes:
+                if buf.tell() + len(chunk) > max_bytes:
                     logger.debug(
                         f"media.fetch: {url!r} exceeded {max_bytes} bytes, aborting"
                     )
                     return None
-                chunks.append(chunk)
-            return b"".join(chunks), resp.content_type or "application/octet-stream"
+                buf.write(chunk)
+            return buf.getvalue(), resp.content_type or "application/octet-stream"
 
     except Exception as e:
         logger.error(f"media.fetch failed for {url!r}: {e}")
         return None
 
 
+class MediaStream:
+    """
+    A download whose headers have been received but whose body is read lazily.
+
+    Iterating yields the body in chunks, so it can be passed straight to
+    ``aiohttp.FormData.add_field`` and uploaded while it is still being
+    downloaded.  Call ``close()`` once the consumer is done with it.
+    """
+
+    def __init__(self, resp: aiohttp.ClientResponse, size: int):
+        self._resp = resp
+        self.size = size
+        self.content_type = resp.content_type or "application/octet-stream"
+
+    async def __aiter__(self):
+        total = 0
+        async for chunk in self._resp.content.iter_chunked(65536):
+            total += len(chunk)
+            if total > self.size:
+                raise ValueError(f"stream exceeded declared size {self.size}")
+            yield chunk
+
+    def close(self) -> None:
+        self._resp.release()
+
+
+class _MediaStreamPayload(aiohttp.payload.AsyncIterablePayload):
+    """Upload payload for a ``MediaStream``.
+
+    Unlike a plain async iterable its size is known up front, so multipart
+    bodies containing it get a ``Content-Length`` instead of chunked framing.
+    """
+
+    def __init__(self, value: MediaStream, *args, **kwargs):
+        super().__init__(value, *args, **kwargs)
+        self._size = value.size
+
+
+aiohttp.payload.PAYLOAD_REGISTRY.register(
+    _MediaStreamPayload, MediaStream, order=aiohttp.payload.Order.try_first
+)
+
+
+async def open_stream(
+    url: str, max_bytes: int = _DEFAULT_MAX, proxy: str | None = None
+) -> MediaStream | None:
+    """
+    Start downloading *url* and return a ``MediaStream`` over its body.
+
+    Only responses that declare a ``Content-Length`` within *max_bytes* are
+    streamed; otherwise ``None`` is returned and callers should fall back to
+    ``fetch_attachment``, which can enforce the limit while buffering.
+    """
+    if not url:
+        return None
+
+    session = get_session(proxy)
+    try:
+        resp = await session.get(url, timeout=aiohttp.ClientTimeout(total=60))
+    except Exception as e:
+        logger.debug(f"media.open_stream failed for {url!r}: {e}")
+        return None
+
+    cl = resp.headers.get("Content-Length")
+    # A content-encoded body is decoded on read, so its length would not
+    # match the declared size.
+    encoded = resp.headers.get("Content-Encoding", "identity") != "identity"
+    if (
+        resp.status >= 400
+        or encoded
+        or not cl
+        or not cl.isdigit()
+        or int(cl) > max_bytes
+    ):
+        resp.release()
+        return None
+    return MediaStream(resp, int(cl))
+
+
 async def fetch_attachment(
     att, max_bytes: int = _DEFAULT_MAX, proxy: str | None = None
 ) -> tuple[bytes, str] | None: